@@ -0,0 +1,141 @@
+"""
+Micro-benchmark for per-query overhead in the Database layer
+
+Compares the old connect-per-call behaviour against the persistent,
+WAL-mode per-thread connection. Reads are timed as SQLite queries on
+team_stats (get_team_stats itself is served from the in-memory stats table
+and never touches SQLite), and the in-memory read is reported on its own
+row. Run from the backend directory:
+
+    python benchmarks/bench_database.py --iterations 2000
+"""
+import os
+import sys
+import time
+import sqlite3
+import argparse
+import tempfile
+import threading
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+from database.db import Database
+
+
+class ConnectPerCallDatabase(Database):
+    """Database that opens a fresh connection for every call (previous behaviour)"""
+    
+    closes_connections = True
+    
+    def get_connection(self):
+        return sqlite3.connect(self.db_path)
+    
+    def close(self):
+        pass
+
+
+def sample_stats(i: int) -> dict:
+    return {
+        "team": f"Team {i % 20}",
+        "matches_played": 10,
+        "wins": i % 7,
+        "draws": 2,
+        "losses": 1,
+        "goals_for": 20,
+        "goals_against": 10,
+        "goal_diff": 10,
+        "points": 20 + i % 5,
+        "position": i % 20 + 1,
+        "form": "WDLWW"
+    }
+
+
+def read_stats_sqlite(db: Database, team_name: str):
+    """One team_stats row straight from SQLite (the pre-stats-table read path)"""
+    conn = db.get_connection()
+    cursor = conn.cursor()
+    cursor.execute("""
+        SELECT team_name, matches_played, wins, draws, losses, goals_for, 
+               goals_against, goal_diff, points, position, form
+        FROM team_stats
+        WHERE team_name = ?
+    """, (team_name,))
+    row = cursor.fetchone()
+    cursor.close()
+    if getattr(db, "closes_connections", False):
+        conn.close()
+    return row
+
+
+def time_per_call(fn, iterations: int) -> float:
+    """Average microseconds per call"""
+    start = time.perf_counter()
+    for i in range(iterations):
+        fn(i)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+def time_concurrent_reads(db: Database, read, iterations: int, readers: int = 4) -> float:
+    """Average microseconds per read while another thread keeps writing"""
+    stop = threading.Event()
+    
+    def writer():
+        i = 0
+        while not stop.is_set():
+            db.save_team_stats(f"Team {i % 20}", sample_stats(i))
+            i += 1
+    
+    def reader():
+        for i in range(iterations):
+            read(db, f"Team {i % 20}")
+    
+    writer_thread = threading.Thread(target=writer)
+    writer_thread.start()
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    start = time.perf_counter()
+    for thread in reader_threads:
+        thread.start()
+    for thread in reader_threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    writer_thread.join()
+    return elapsed / (iterations * readers) * 1e6
+
+
+def run(iterations: int):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label, cls in (("connect-per-call", ConnectPerCallDatabase), ("persistent+WAL", Database)):
+            db = cls(os.path.join(tmp, f"{label}.db"))
+            db.save_team_stats_bulk([sample_stats(i) for i in range(20)])
+            results[label] = {
+                "read_us": time_per_call(lambda i: read_stats_sqlite(db, f"Team {i % 20}"), iterations),
+                "write_us": time_per_call(lambda i: db.save_team_stats(f"Team {i % 20}", sample_stats(i)), iterations),
+                "read_under_write_us": time_concurrent_reads(db, read_stats_sqlite, iterations // 4),
+            }
+            if label == "persistent+WAL":
+                # What handlers actually call: the in-memory stats table
+                results["in-memory table"] = {
+                    "read_us": time_per_call(lambda i: db.get_team_stats(f"Team {i % 20}"), iterations),
+                    "write_us": None,
+                    "read_under_write_us": time_concurrent_reads(
+                        db, lambda db, name: db.get_team_stats(name), iterations // 4
+                    ),
+                }
+            db.close()
+    
+    print(f"{'mode':<20}{'read (us)':>12}{'write (us)':>12}{'read|write (us)':>18}")
+    for label, r in results.items():
+        write = f"{r['write_us']:>12.1f}" if r["write_us"] is not None else f"{'-':>12}"
+        print(f"{label:<20}{r['read_us']:>12.1f}{write}{r['read_under_write_us']:>18.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,217 @@
+"""
+HTTP load test of the API against a local football-data.org stand-in
+
+Starts the fake upstream (benchmarks/fake_football_data.py) and the app
+under uvicorn in this process, on a throwaway database, then drives each
+endpoint with a fixed number of requests at the given concurrency. Reports
+requests/sec and p50/p95/p99 latency per endpoint, plus the upstream calls
+each endpoint caused, and writes everything to a JSON file so runs can be
+compared across commits. Run from the backend directory:
+
+    python benchmarks/bench_http_load.py --concurrency 32 --requests 1000
+    python benchmarks/bench_http_load.py --endpoints stats,players --output before.json
+"""
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+import numpy as np
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+import aiohttp
+import uvicorn
+
+from benchmarks.fake_football_data import TEAMS, FakeFootballData
+
+ENDPOINTS = ("teams", "stats", "players", "predict_match", "predict_season")
+
+
+def endpoint_paths(name: str):
+    """Endless cycle of request paths for an endpoint, spread over all teams"""
+    names = [short_name.replace(" ", "_") for _, _, short_name, _ in TEAMS]
+    i = 0
+    while True:
+        home = names[i % len(names)]
+        away = names[(i * 7 + 3) % len(names)]
+        if home == away:
+            away = names[(i + 1) % len(names)]
+        yield {
+            "teams": "/api/teams",
+            "stats": f"/api/stats/{home}",
+            "players": f"/api/players/{home}",
+            "predict_match": f"/api/predict/match/{home}/{away}",
+            "predict_season": "/api/predict/season",
+        }[name]
+        i += 1
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_api(port: int):
+    """Run the app under uvicorn in a background thread"""
+    import main
+    server = uvicorn.Server(uvicorn.Config(main.app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="api", daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    # Measure steady state: let the background refresh finish its first pass
+    deadline = time.monotonic() + 60
+    while (main.refresh_scheduler.enabled and time.monotonic() < deadline
+           and not main.refresh_scheduler.ready):
+        time.sleep(0.05)
+    return server, thread
+
+
+async def drive(session: aiohttp.ClientSession, base: str, name: str,
+                requests: int, concurrency: int) -> dict:
+    paths = endpoint_paths(name)
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def worker():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            path = next(paths)
+            start = time.perf_counter()
+            try:
+                async with session.get(base + path) as response:
+                    await response.read()
+                    if response.status != 200:
+                        errors += 1
+            except aiohttp.ClientError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(min(concurrency, requests))])
+    elapsed = time.perf_counter() - start
+    ms = np.array(latencies) * 1000
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "seconds": elapsed,
+        "requests_per_second": len(latencies) / elapsed,
+        "mean_ms": float(ms.mean()),
+        "p50_ms": float(np.percentile(ms, 50)),
+        "p95_ms": float(np.percentile(ms, 95)),
+        "p99_ms": float(np.percentile(ms, 99)),
+        "max_ms": float(ms.max())
+    }
+
+
+async def run_load(base: str, upstream: FakeFootballData, endpoints, requests: int,
+                   season_requests: int, concurrency: int, warmup: int) -> dict:
+    results = {}
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    async with aiohttp.ClientSession(connector=connector) as session:
+        for name in endpoints:
+            count = season_requests if name == "predict_season" else requests
+            # Warm-up fills caches the way a running server would have them
+            await drive(session, base, name, warmup, concurrency)
+            calls_before = sum(upstream.calls.values())
+            results[name] = await drive(session, base, name, count, concurrency)
+            results[name]["upstream_calls"] = sum(upstream.calls.values()) - calls_before
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=backend_dir, stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(args):
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        sys.exit(f"Unknown endpoints: {', '.join(sorted(unknown))} (choose from {', '.join(ENDPOINTS)})")
+
+    upstream = FakeFootballData().start()
+    with tempfile.TemporaryDirectory() as tmp:
+        # Configure the app before it is imported
+        os.environ["DATABASE_PATH"] = os.path.join(tmp, "bench.db")
+        os.environ["HTTP_CACHE_DIR"] = os.path.join(tmp, "http_cache")
+        os.environ["FOOTBALL_DATA_BASE_URL"] = upstream.base_url
+        os.environ["PLAYER_PHOTO_URL"] = upstream.photo_url
+        os.environ["MODEL_WATCH_INTERVAL"] = "0"
+        # The fake upstream has no quota; don't let the client-side limiter throttle it
+        os.environ["UPSTREAM_RATE_PER_MINUTE"] = "1000000"
+        os.environ["UPSTREAM_BURST"] = "1000"
+        os.environ["SEASON_SIMULATIONS"] = str(args.simulations)
+
+        port = free_port()
+        server, thread = start_api(port)
+        try:
+            results = asyncio.run(run_load(
+                f"http://127.0.0.1:{port}", upstream, endpoints, args.requests,
+                args.season_requests, args.concurrency, args.warmup
+            ))
+        finally:
+            server.should_exit = True
+            thread.join()
+            upstream.stop()
+
+    print(f"{'endpoint':<16}{'req/s':>9}{'p50 (ms)':>10}{'p95 (ms)':>10}{'p99 (ms)':>10}{'errors':>8}{'upstream':>10}")
+    for name, result in results.items():
+        print(f"{name:<16}{result['requests_per_second']:>9.1f}{result['p50_ms']:>10.2f}"
+              f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>8}"
+              f"{result['upstream_calls']:>10}")
+
+    report = {
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+        "config": {
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "season_requests": args.season_requests,
+            "warmup": args.warmup,
+            "simulations": args.simulations,
+            "cpu_count": os.cpu_count()
+        },
+        "endpoints": results
+    }
+    output = args.output or os.path.join(
+        backend_dir, "benchmarks", "results", f"http_load_{report['commit'] or 'local'}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS),
+                        help=f"comma-separated subset of: {', '.join(ENDPOINTS)}")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=500, help="requests per endpoint")
+    parser.add_argument("--season-requests", type=int, default=50,
+                        help="requests for predict_season (each runs a full simulation)")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--simulations", type=int, default=10000,
+                        help="SEASON_SIMULATIONS for the app under test")
+    parser.add_argument("--output", default=None, help="JSON results path")
+    args = parser.parse_args()
+    run(args)
@@ -0,0 +1,164 @@
+"""
+Benchmark of single-match prediction latency
+
+Stats source: "sqlite" reads each team's stats with a query on a database
+worker thread (the previous behaviour); "in-memory" reads the process-local
+stats array.
+Inference: "two-pass" runs predict_proba, then predict, then the score model
+through the sklearn wrappers on Python lists (the previous behaviour);
+"single-pass" calls the boosters directly on a reused float32 buffer and
+takes the class from the probabilities.
+The prediction cache is bypassed so every call runs features + inference.
+Run from the backend directory:
+
+    python benchmarks/bench_predict_latency.py --iterations 2000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import numpy as np
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+import xgboost as xgb
+
+from database.db import Database
+from database.async_db import AsyncDatabase
+from data.feature_engineering import N_FEATURES, FeatureEngineer, build_feature_matrix
+from data.stats_array import stats_to_array
+from models.predictor import MatchPredictor
+
+
+class SQLiteStatsDatabase(Database):
+    """Database that answers stats reads from SQLite on every call"""
+    
+    def get_team_stats(self, team_name: str):
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        names = self._stored_names(team_name)
+        placeholders = ", ".join("?" for _ in names)
+        cursor.execute(f"""
+            SELECT team_name, matches_played, wins, draws, losses, goals_for, 
+                   goals_against, goal_diff, points, position, form
+            FROM team_stats
+            WHERE team_name IN ({placeholders})
+            ORDER BY updated_at DESC
+            LIMIT 1
+        """, names)
+        row = cursor.fetchone()
+        cursor.close()
+        return self._stats_from_row(row) if row else None
+    
+
+
+class SQLiteStatsAsyncDatabase(AsyncDatabase):
+    """Routes stats reads through the database thread pool, as before"""
+    
+    async def get_team_stats(self, team_name: str):
+        return await self._run(self.sync.get_team_stats, team_name)
+
+
+class SQLiteFeatureEngineer(FeatureEngineer):
+    """Gathers per-team stats reads before building features, as before"""
+    
+    async def get_fixture_matrix(self, fixtures):
+        teams = sorted({team for fixture in fixtures for team in fixture})
+        stats_list = await asyncio.gather(*[self.db.get_team_stats(team) for team in teams])
+        index = {team: i for i, team in enumerate(teams)}
+        pairs = np.array([(index[home], index[away]) for home, away in fixtures], dtype=np.intp)
+        has_stats = np.array([bool(stats) for stats in stats_list])
+        valid = has_stats[pairs[:, 0]] & has_stats[pairs[:, 1]]
+        return build_feature_matrix(stats_to_array([s or {} for s in stats_list]), pairs), valid
+
+
+class TwoPassMatchPredictor(MatchPredictor):
+    """Runs the outcome model twice and the score model through the wrappers, as before"""
+    
+    async def _predict_uncached(self, home_team: str, away_team: str):
+        features = await self.feature_engineer.get_match_features(home_team, away_team)
+        if features is None:
+            return await self._simple_predict(home_team, away_team)
+        outcome_probs = self.model.predict_proba([features])[0]
+        outcome_pred = self.model.predict([features])[0]
+        scores = self.score_model.predict([features])[0]
+        return {
+            "predicted_result": {0: "HOME_WIN", 1: "DRAW", 2: "AWAY_WIN"}[outcome_pred],
+            "home_win_probability": float(outcome_probs[0]),
+            "draw_probability": float(outcome_probs[1]),
+            "away_win_probability": float(outcome_probs[2]),
+            "predicted_home_score": max(0, int(round(scores[0]))),
+            "predicted_away_score": max(0, int(round(scores[1]))),
+            "confidence": float(max(outcome_probs))
+        }
+
+
+def make_predictor(db: AsyncDatabase, feature_engineer: FeatureEngineer,
+                   predictor_class=MatchPredictor) -> MatchPredictor:
+    rng = np.random.default_rng(0)
+    X = rng.random((500, N_FEATURES)) * 40
+    predictor = predictor_class()
+    predictor._install(
+        xgb.XGBClassifier(n_estimators=100, max_depth=5).fit(X, rng.integers(0, 3, 500)),
+        xgb.XGBRegressor(n_estimators=100, max_depth=5).fit(X, rng.integers(0, 4, (500, 2))),
+        None
+    )
+    predictor.db = db
+    feature_engineer.db = db
+    predictor.feature_engineer = feature_engineer
+    return predictor
+
+
+async def measure(call, teams, iterations: int) -> np.ndarray:
+    timings = []
+    for i in range(iterations):
+        home, away = teams[i % len(teams)], teams[(i * 7 + 1) % len(teams)]
+        if home == away:
+            away = teams[(i + 1) % len(teams)]
+        start = time.perf_counter()
+        await call(home, away)
+        timings.append(time.perf_counter() - start)
+    return np.array(timings) * 1000
+
+
+def run(iterations: int):
+    teams = [f"Team {i}" for i in range(20)]
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        seed_db = Database(path)
+        seed_db.save_teams([{"id": i + 1, "name": name} for i, name in enumerate(teams)])
+        seed_db.save_team_stats_bulk([
+            {"team": name, "matches_played": 10, "wins": i % 8, "draws": 2, "losses": 8 - i % 8,
+             "goals_for": 10 + i, "goals_against": 20 - i % 10, "goal_diff": i - 5,
+             "points": 3 * (i % 8) + 2, "position": 20 - i, "form": "WDLWW"}
+            for i, name in enumerate(teams)
+        ])
+        
+        setups = (
+            ("sqlite", "two-pass", SQLiteStatsAsyncDatabase(SQLiteStatsDatabase(path)),
+             SQLiteFeatureEngineer(), TwoPassMatchPredictor),
+            ("in-memory", "two-pass", AsyncDatabase(Database(path)), FeatureEngineer(), TwoPassMatchPredictor),
+            ("in-memory", "single-pass", AsyncDatabase(Database(path)), FeatureEngineer(), MatchPredictor),
+        )
+        print(f"{'stats source':<14}{'inference':<13}{'step':<10}{'mean (ms)':>11}{'p50 (ms)':>10}{'p99 (ms)':>10}")
+        for label, inference, db, feature_engineer, predictor_class in setups:
+            predictor = make_predictor(db, feature_engineer, predictor_class)
+            steps = (
+                ("features", feature_engineer.get_match_features),
+                ("predict", predictor._predict_uncached),
+            )
+            for step, call in steps:
+                asyncio.run(measure(call, teams, 50))  # warm up
+                timings = asyncio.run(measure(call, teams, iterations))
+                print(f"{label:<14}{inference:<13}{step:<10}{timings.mean():>11.3f}"
+                      f"{np.percentile(timings, 50):>10.3f}{np.percentile(timings, 99):>10.3f}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+    run(args.iterations)
@@ -0,0 +1,63 @@
+"""
+Benchmark for the point-in-time rolling team-stats engine
+
+Replays synthetic seasons (20 teams drawn from a pool of 40, every pairing
+home and away, random scores) and builds the as-of-kickoff feature matrix.
+Run from the backend directory:
+
+    python benchmarks/bench_rolling_stats.py --seasons 60
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+from datetime import datetime, timedelta
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+from data.rolling_stats import point_in_time_features
+
+
+def make_matches(seasons: int):
+    rng = np.random.default_rng(0)
+    pool = [f"Team {i}" for i in range(40)]
+    matches = []
+    for season in range(seasons):
+        teams = rng.choice(pool, 20, replace=False)
+        fixtures = [(h, a) for h in teams for a in teams if h != a]
+        order = rng.permutation(len(fixtures))
+        kickoff = datetime(1960 + season, 8, 10)
+        goals = rng.poisson([1.5, 1.2], size=(len(fixtures), 2))
+        for k, f in enumerate(order):
+            home, away = fixtures[f]
+            matches.append({
+                "id": len(matches), "home_team": home, "away_team": away,
+                "date": (kickoff + timedelta(hours=12 * k)).isoformat(),
+                "home_score": int(goals[k, 0]), "away_score": int(goals[k, 1])
+            })
+    return matches
+
+
+def run(seasons: int, repeats: int):
+    matches = make_matches(seasons)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        X, played = point_in_time_features(matches)
+        timings.append(time.perf_counter() - start)
+    
+    print(f"{len(played)} matches over {seasons} seasons -> {X.shape[0]} x {X.shape[1]} features")
+    print(f"best {min(timings) * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms "
+          f"({min(timings) / len(played) * 1e6:.1f} us/match)")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seasons", type=int, default=60)
+    parser.add_argument("--repeats", type=int, default=3)
+    args = parser.parse_args()
+    run(args.seasons, args.repeats)
@@ -0,0 +1,48 @@
+"""
+Benchmark for the Monte Carlo season simulator
+
+Simulates a full 380-fixture season (every pairing home and away) with
+random outcome probabilities. Run from the backend directory:
+
+    python benchmarks/bench_season_simulator.py --simulations 100000
+"""
+import os
+import sys
+import time
+import argparse
+import numpy as np
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+from models.season_simulator import SeasonSimulator
+
+
+def run(simulations: int, repeats: int):
+    n_teams = 20
+    fixtures = [(h, a) for h in range(n_teams) for a in range(n_teams) if h != a]
+    home_idx, away_idx = zip(*fixtures)
+    rng = np.random.default_rng(0)
+    probabilities = rng.dirichlet([4, 3, 3], size=len(fixtures))
+    teams = [f"Team {i}" for i in range(n_teams)]
+    
+    simulator = SeasonSimulator(n_simulations=simulations, seed=0)
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = simulator.simulate(teams, np.zeros(n_teams), home_idx, away_idx, probabilities)
+        timings.append(time.perf_counter() - start)
+    
+    print(f"{simulations} simulations x {len(fixtures)} fixtures")
+    print(f"best {min(timings) * 1000:.1f} ms, median {np.median(timings) * 1000:.1f} ms")
+    print(f"title probabilities sum to {result['title_probability'].sum():.3f}")
+    return timings
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--simulations", type=int, default=100000)
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    run(args.simulations, args.repeats)
@@ -0,0 +1,246 @@
+"""
+Local stand-in for the football-data.org v4 API (and the Wikipedia summary
+endpoint used for player photos), serving canned Premier League data
+
+Used by the load-test benchmark; can also be run on its own and pointed to
+by hand. Every path is counted, and GET /_calls returns the counts. JSON
+responses carry an ETag and Last-Modified, and conditional requests that
+match get 304 Not Modified, as the real API does.
+
+    python benchmarks/fake_football_data.py --port 8765
+"""
+import argparse
+import asyncio
+import hashlib
+import threading
+from datetime import datetime, timedelta
+
+from aiohttp import web
+
+TEAMS = [
+    (57, "Arsenal FC", "Arsenal", "ARS"),
+    (58, "Aston Villa FC", "Aston Villa", "AVL"),
+    (1044, "AFC Bournemouth", "Bournemouth", "BOU"),
+    (402, "Brentford FC", "Brentford", "BRE"),
+    (397, "Brighton & Hove Albion FC", "Brighton Hove", "BHA"),
+    (61, "Chelsea FC", "Chelsea", "CHE"),
+    (354, "Crystal Palace FC", "Crystal Palace", "CRY"),
+    (62, "Everton FC", "Everton", "EVE"),
+    (63, "Fulham FC", "Fulham", "FUL"),
+    (349, "Ipswich Town FC", "Ipswich Town", "IPS"),
+    (338, "Leicester City FC", "Leicester City", "LEI"),
+    (64, "Liverpool FC", "Liverpool", "LIV"),
+    (65, "Manchester City FC", "Man City", "MCI"),
+    (66, "Manchester United FC", "Man United", "MUN"),
+    (67, "Newcastle United FC", "Newcastle", "NEW"),
+    (351, "Nottingham Forest FC", "Nottingham", "NOT"),
+    (340, "Southampton FC", "Southampton", "SOU"),
+    (73, "Tottenham Hotspur FC", "Tottenham", "TOT"),
+    (563, "West Ham United FC", "West Ham", "WHU"),
+    (76, "Wolverhampton Wanderers FC", "Wolverhampton", "WOL"),
+]
+POSITIONS = ["Goalkeeper"] * 3 + ["Defence"] * 8 + ["Midfield"] * 8 + ["Offence"] * 6
+SEASON_START = datetime(2025, 8, 16, 15, 0)
+
+
+def _team(team):
+    team_id, name, short_name, tla = team
+    return {"id": team_id, "name": name, "shortName": short_name, "tla": tla,
+            "crest": f"https://crests.football-data.org/{team_id}.png", "founded": 1900}
+
+
+def _fixtures():
+    """Double round robin; the first half of the rounds are played"""
+    n = len(TEAMS)
+    rotation = list(range(n))
+    rounds = []
+    for _ in range(n - 1):
+        pairs = [(rotation[i], rotation[n - 1 - i]) for i in range(n // 2)]
+        rounds.append(pairs)
+        rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+    rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+
+    matches = []
+    for round_no, pairs in enumerate(rounds):
+        kickoff = SEASON_START + timedelta(days=7 * round_no)
+        played = round_no < len(rounds) // 2
+        for home, away in pairs:
+            match_id = 500000 + len(matches)
+            match = {
+                "id": match_id,
+                "utcDate": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "status": "FINISHED" if played else "SCHEDULED",
+                "matchday": round_no + 1,
+                "homeTeam": _team(TEAMS[home]),
+                "awayTeam": _team(TEAMS[away]),
+                "score": {"fullTime": {"home": None, "away": None}}
+            }
+            if played:
+                match["score"]["fullTime"] = {
+                    "home": (match_id * 7 + home) % 4,
+                    "away": (match_id * 3 + away) % 3
+                }
+            matches.append(match)
+    return matches
+
+
+def _standings(matches):
+    table = {team[0]: {"team": _team(team), "playedGames": 0, "won": 0, "draw": 0, "lost": 0,
+                       "points": 0, "goalsFor": 0, "goalsAgainst": 0, "results": []}
+             for team in TEAMS}
+    for match in matches:
+        if match["status"] != "FINISHED":
+            continue
+        score = match["score"]["fullTime"]
+        for side, scored, conceded in (("homeTeam", score["home"], score["away"]),
+                                       ("awayTeam", score["away"], score["home"])):
+            row = table[match[side]["id"]]
+            row["playedGames"] += 1
+            row["goalsFor"] += scored
+            row["goalsAgainst"] += conceded
+            result = "W" if scored > conceded else "D" if scored == conceded else "L"
+            row["won" if result == "W" else "draw" if result == "D" else "lost"] += 1
+            row["points"] += {"W": 3, "D": 1, "L": 0}[result]
+            row["results"].append(result)
+    rows = sorted(table.values(), key=lambda r: (-r["points"], r["goalsAgainst"] - r["goalsFor"]))
+    for position, row in enumerate(rows, 1):
+        row["position"] = position
+        row["goalDifference"] = row["goalsFor"] - row["goalsAgainst"]
+        row["form"] = ",".join(reversed(row.pop("results")[-5:]))
+    return {"standings": [{"type": "TOTAL", "table": rows}]}
+
+
+def _squad(team):
+    team_id = team[0]
+    return [{
+        "id": team_id * 100 + i,
+        "name": f"Player{i} {team[3].title()}",
+        "position": position,
+        "dateOfBirth": "1998-01-01",
+        "nationality": "England",
+        "shirtNumber": i + 1
+    } for i, position in enumerate(POSITIONS)]
+
+
+def create_app() -> web.Application:
+    matches = _fixtures()
+    standings = _standings(matches)
+    teams_by_id = {team[0]: team for team in TEAMS}
+    calls = {}
+    last_modified = datetime.utcnow().strftime("%a, %d %b %Y %H:%M:%S GMT")
+
+    @web.middleware
+    async def count_calls(request, handler):
+        if request.path != "/_calls":
+            calls[request.path] = calls.get(request.path, 0) + 1
+        return await handler(request)
+
+    @web.middleware
+    async def conditional(request, handler):
+        response = await handler(request)
+        if response.status != 200 or not isinstance(response, web.Response) or response.body is None:
+            return response
+        etag = '"' + hashlib.sha1(response.body).hexdigest()[:16] + '"'
+        response.headers["ETag"] = etag
+        response.headers["Last-Modified"] = last_modified
+        if request.headers.get("If-None-Match") == etag:
+            return web.Response(status=304, headers={"ETag": etag, "Last-Modified": last_modified})
+        return response
+
+    async def get_teams(request):
+        return web.json_response({"count": len(TEAMS), "teams": [_team(team) for team in TEAMS]})
+
+    async def get_standings(request):
+        return web.json_response(standings)
+
+    async def get_matches(request):
+        status = request.query.get("status")
+        selected = [m for m in matches if status is None or m["status"] == status]
+        if "limit" in request.query:
+            selected = selected[-int(request.query["limit"]):]
+        return web.json_response({"count": len(selected), "matches": selected})
+
+    async def get_team(request):
+        team = teams_by_id.get(int(request.match_info["team_id"]))
+        if team is None:
+            return web.json_response({"message": "Team not found"}, status=404)
+        return web.json_response(dict(_team(team), squad=_squad(team)))
+
+    async def get_photo(request):
+        name = request.match_info["name"]
+        return web.json_response({
+            "type": "standard", "title": name,
+            "thumbnail": {"source": f"https://upload.wikimedia.org/{name}.jpg"}
+        })
+
+    async def get_calls(request):
+        return web.json_response(calls)
+
+    app = web.Application(middlewares=[count_calls, conditional])
+    app.router.add_get("/v4/competitions/PL/teams", get_teams)
+    app.router.add_get("/v4/competitions/PL/standings", get_standings)
+    app.router.add_get("/v4/competitions/PL/matches", get_matches)
+    app.router.add_get("/v4/teams/{team_id}", get_team)
+    app.router.add_get("/wiki/{name}", get_photo)
+    app.router.add_get("/_calls", get_calls)
+    app["calls"] = calls
+    return app
+
+
+class FakeFootballData:
+    """Runs the fake API on its own event loop in a background thread"""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.app = create_app()
+        self._loop = asyncio.new_event_loop()
+        self._runner = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/v4"
+
+    @property
+    def photo_url(self) -> str:
+        return f"http://{self.host}:{self.port}/wiki/"
+
+    @property
+    def calls(self) -> dict:
+        return dict(self.app["calls"])
+
+    async def _start(self):
+        self._runner = web.AppRunner(self.app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+
+    def start(self):
+        started = threading.Event()
+
+        def run():
+            asyncio.set_event_loop(self._loop)
+            self._loop.run_until_complete(self._start())
+            started.set()
+            self._loop.run_forever()
+
+        self._thread = threading.Thread(target=run, name="fake-football-data", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self
+
+    def stop(self):
+        if self._runner is not None:
+            asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    web.run_app(create_app(), host=args.host, port=args.port)
@@ -1,59 +1,189 @@
 import os
+import logging
 import aiohttp
 import asyncio
 from typing import List, Optional, Dict
 from datetime import datetime
 import json
+import time
+
+from data.team_resolver import TeamResolver
+from database.db import Database
+from data.response_cache import ResponseCache, stale_responses
+from data.rate_limiter import PRIORITY_USER, upstream_limiter
+
+logger = logging.getLogger(__name__)
 
 class DataFetcher:
     """Fetches Premier League data from Football-Data.org API"""
     
-    def __init__(self):
+    def __init__(self, priority: int = PRIORITY_USER, resolver: Optional[TeamResolver] = None):
         self.api_key = os.getenv("FOOTBALL_DATA_API_KEY", "")
-        self.base_url = "https://api.football-data.org/v4"
+        self.base_url = os.getenv("FOOTBALL_DATA_BASE_URL", "https://api.football-data.org/v4")
+        # Wikipedia page-summary endpoint used for player photos
+        self.photo_url = os.getenv("PLAYER_PHOTO_URL", "https://en.wikipedia.org/api/rest_v1/page/summary/")
         self.headers = {
             "X-Auth-Token": self.api_key,
             "Content-Type": "application/json"
         }
         self.competition_id = "PL"  # Premier League
+        
+        # Shared HTTP session, created lazily and reused by every request
+        self._session: Optional[aiohttp.ClientSession] = None
+        # Connector tuning (per-host limits, keep-alive, DNS cache)
+        self.pool_limit = int(os.getenv("HTTP_POOL_LIMIT", "100"))
+        self.pool_limit_per_host = int(os.getenv("HTTP_POOL_LIMIT_PER_HOST", "20"))
+        self.keepalive_timeout = float(os.getenv("HTTP_KEEPALIVE_TIMEOUT", "30"))
+        self.dns_cache_ttl = int(os.getenv("HTTP_DNS_CACHE_TTL", "300"))
+        
+        # Standings snapshot: the whole table parsed once, keyed by team id
+        self.standings_ttl = float(os.getenv("STANDINGS_TTL", "600"))
+        self._standings: Dict[int, Dict] = {}
+        self._standings_fetched_at = 0.0
+        
+        # Scheduled fixtures change rarely; keep them for FIXTURES_TTL seconds
+        self.fixtures_ttl = float(os.getenv("FIXTURES_TTL", "600"))
+        self._upcoming: List[Dict] = []
+        self._upcoming_fetched_at = 0.0
+        
+        # Team name -> API team id index, filled from teams/standings responses.
+        # Shared with the database so every module resolves names the same way
+        self.resolver = resolver or Database().resolver
+        
+        # Upstream responses persisted across restarts, with ETag/Last-Modified
+        self.response_cache = ResponseCache()
+        # Endpoint -> upstream request in progress, awaited by every concurrent caller
+        self._inflight: Dict[str, asyncio.Future] = {}
+        
+        # Upstream quota shared by every fetcher in the process; this fetcher's
+        # requests queue at `priority` (user-facing before background/training)
+        self.limiter = upstream_limiter
+        self.priority = priority
+        # Endpoints answered from stale cached bodies, shared process-wide
+        self.stale = stale_responses
+    
+    async def start(self):
+        """Open the shared HTTP session (called on app startup)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_limit,
+                limit_per_host=self.pool_limit_per_host,
+                keepalive_timeout=self.keepalive_timeout,
+                ttl_dns_cache=self.dns_cache_ttl,
+                use_dns_cache=True
+            )
+            self._session = aiohttp.ClientSession(connector=connector)
+        return self._session
+    
+    async def close(self):
+        """Close the shared HTTP session (called on app shutdown)"""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+    
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, opening it if needed"""
+        if self._session is None or self._session.closed:
+            return await self.start()
+        return self._session
     
-    async def _make_request(self, endpoint: str, retries: int = 3) -> Optional[Dict]:
-        """Make API request with retry logic and timeout"""
+    async def _make_request(self, endpoint: str, retries: int = 3, revalidate: bool = False,
+                            priority: Optional[int] = None) -> Optional[Dict]:
+        """Make API request with retry logic and timeout
+        
+        Responses are kept in the on-disk response cache: a fresh entry is
+        served without a request, an expired one is revalidated with
+        If-None-Match / If-Modified-Since (reused on 304), and a stale one
+        is served when the API fails. revalidate skips the freshness check.
+        
+        Each request first takes a token from the shared rate limiter, queued
+        by priority (default: the fetcher's). If none is granted within that
+        priority's wait, the cached body is served (stale) instead.
+        """
+        cached = await self.response_cache.get(endpoint)
+        if cached is not None and not revalidate and self.response_cache.is_fresh(endpoint, cached):
+            return cached["body"]
+        
+        # Single flight: concurrent callers for an endpoint share one upstream request
+        task = self._inflight.get(endpoint)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(
+                endpoint, cached, retries, self.priority if priority is None else priority
+            ))
+            self._inflight[endpoint] = task
+            task.add_done_callback(lambda _: self._inflight.pop(endpoint, None))
+        # Shielded so one cancelled caller doesn't cancel the request for the others
+        return await asyncio.shield(task)
+    
+    def _serve_stale(self, endpoint: str, cached: Optional[Dict], reason: str) -> Optional[Dict]:
+        """Fall back to the cached body (however old) when the API can't be asked"""
+        if cached is None:
+            logger.warning("%s for %s; no cached data available", reason, endpoint)
+            return None
+        self.stale.mark(endpoint, cached["fetched_at"])
+        age = time.time() - cached["fetched_at"]
+        logger.warning("%s for %s; serving stale data from %.0fs ago", reason, endpoint, age)
+        return cached["body"]
+    
+    async def _fetch(self, endpoint: str, cached: Optional[Dict], retries: int, priority: int) -> Optional[Dict]:
+        """Request an endpoint from the API, revalidating the cached entry if there is one"""
         url = f"{self.base_url}/{endpoint}"
         timeout = aiohttp.ClientTimeout(total=10)  # 10 second timeout
+        headers = dict(self.headers)
+        if cached is not None:
+            if cached.get("etag"):
+                headers["If-None-Match"] = cached["etag"]
+            if cached.get("last_modified"):
+                headers["If-Modified-Since"] = cached["last_modified"]
+        
+        session = await self._get_session()
         
         for attempt in range(retries):
+            if not await self.limiter.acquire(priority):
+                return self._serve_stale(endpoint, cached, "Upstream request quota exhausted")
             try:
-                async with aiohttp.ClientSession(timeout=timeout) as session:
-                    async with session.get(url, headers=self.headers) as response:
-                        if response.status == 200:
-                            return await response.json()
-                        elif response.status == 429:
-                            # Rate limited - return None immediately instead of waiting
-                            print(f"Rate limit exceeded for {endpoint}. Returning cached data if available.")
-                            return None  # Don't wait, just return None so we can use cached data
-                        elif response.status == 403:
-                            print(f"API access forbidden (403). Check API key.")
-                            return None
-                        else:
-                            print(f"API request failed: {response.status}")
-                            if attempt < retries - 1:
-                                await asyncio.sleep(2 ** attempt)  # Exponential backoff
-                                continue
-                            return None
+                async with session.get(url, headers=headers, timeout=timeout) as response:
+                    if response.status == 200:
+                        data = await response.json()
+                        await self.response_cache.put(
+                            endpoint, data,
+                            etag=response.headers.get("ETag"),
+                            last_modified=response.headers.get("Last-Modified")
+                        )
+                        self.stale.clear(endpoint)
+                        return data
+                    elif response.status == 304 and cached is not None:
+                        # Unchanged upstream: reuse the cached body
+                        await self.response_cache.touch(endpoint, cached)
+                        self.stale.clear(endpoint)
+                        return cached["body"]
+                    elif response.status == 429:
+                        # Rate limited: hold every fetcher until the upstream counter resets
+                        reset = response.headers.get("X-RequestCounter-Reset") or response.headers.get("Retry-After")
+                        self.limiter.pause(float(reset) if reset and reset.isdigit() else 60.0)
+                        return self._serve_stale(endpoint, cached, "Rate limit exceeded")
+                    elif response.status == 403:
+                        print(f"API access forbidden (403). Check API key.")
+                        return self._serve_stale(endpoint, cached, "API request failed")
+                    else:
+                        print(f"API request failed: {response.status}")
+                        if attempt < retries - 1:
+                            await asyncio.sleep(2 ** attempt)  # Exponential backoff
+                            continue
+                        return self._serve_stale(endpoint, cached, "API request failed")
             except asyncio.TimeoutError:
                 print(f"Request timeout (attempt {attempt + 1}/{retries})")
                 if attempt < retries - 1:
                     await asyncio.sleep(2 ** attempt)
                     continue
-                return None
+                return self._serve_stale(endpoint, cached, "API request failed")
             except Exception as e:
                 print(f"Error fetching data (attempt {attempt + 1}/{retries}): {e}")
                 if attempt < retries - 1:
                     await asyncio.sleep(2 ** attempt)
                     continue
-                return None
-        return None
+                return self._serve_stale(endpoint, cached, "API request failed")
+        return self._serve_stale(endpoint, cached, "API request failed")
     
     async def fetch_teams(self) -> List[Dict]:
         """Fetch all Premier League teams"""
@@ -67,16 +197,22 @@ class DataFetcher:
                     "id": team.get("id"),
                     "name": team.get("name"),
                     "short_name": team.get("shortName"),
+                    "tla": team.get("tla"),
                     "crest": team.get("crest"),
                     "founded": team.get("founded")
                 })
+            self.resolver.add_teams(teams)
             return teams
         return []
     
-    async def fetch_upcoming_matches(self) -> List[Dict]:
+    async def fetch_upcoming_matches(self, force: bool = False) -> List[Dict]:
         """Fetch upcoming Premier League matches"""
+        age = time.monotonic() - self._upcoming_fetched_at
+        if not force and self._upcoming and age < self.fixtures_ttl:
+            return self._upcoming
+        
         endpoint = f"competitions/{self.competition_id}/matches?status=SCHEDULED"
-        data = await self._make_request(endpoint)
+        data = await self._make_request(endpoint, revalidate=force)
         
         if data and "matches" in data:
             matches = []
@@ -90,65 +226,80 @@ class DataFetcher:
                     "home_score": match.get("score", {}).get("fullTime", {}).get("home"),
                     "away_score": match.get("score", {}).get("fullTime", {}).get("away")
                 })
+            self._upcoming = matches
+            self._upcoming_fetched_at = time.monotonic()
             return matches
-        return []
+        # Serve the last known fixtures (possibly stale) on failure
+        return self._upcoming
     
-    async def fetch_team_stats(self, team_name: str) -> Optional[Dict]:
-        """Fetch statistics for a specific team"""
-        # First, get the team ID
-        teams = await self.fetch_teams()
-        team_id = None
-        
-        # Normalize team name for matching (remove FC, handle variations)
-        normalized_input = team_name.lower().replace(" fc", "").strip()
-        
-        for team in teams:
-            normalized_team_name = team["name"].lower().replace(" fc", "").strip()
-            # Try exact match first
-            if team["name"].lower() == team_name.lower():
-                team_id = team["id"]
-                break
-            # Try normalized match (without FC)
-            elif normalized_team_name == normalized_input:
-                team_id = team["id"]
-                break
-            # Try partial match
-            elif normalized_input in normalized_team_name or normalized_team_name in normalized_input:
-                team_id = team["id"]
-                break
-        
-        if not team_id:
-            return None
+    def _parse_standings(self, data: Dict) -> Dict[int, Dict]:
+        """Parse the TOTAL standings table into stats keyed by team id"""
+        standings = {}
+        for standing_group in data.get("standings", []):
+            if standing_group.get("type") != "TOTAL":
+                continue
+            for table_entry in standing_group.get("table", []):
+                team_data = table_entry.get("team", {})
+                if team_data.get("id") is None:
+                    continue
+                self.resolver.add_team(team_data["id"], team_data.get("name"),
+                                       (team_data.get("shortName"), team_data.get("tla")))
+                standings[team_data["id"]] = {
+                    "team": team_data.get("name"),
+                    "matches_played": table_entry.get("playedGames", 0),
+                    "wins": table_entry.get("won", 0),
+                    "draws": table_entry.get("draw", 0),
+                    "losses": table_entry.get("lost", 0),
+                    "goals_for": table_entry.get("goalsFor", 0),
+                    "goals_against": table_entry.get("goalsAgainst", 0),
+                    "goal_diff": table_entry.get("goalDifference", 0),
+                    "points": table_entry.get("points", 0),
+                    "position": table_entry.get("position", 0),
+                    "form": table_entry.get("form", "")
+                }
+        return standings
+    
+    async def fetch_standings(self, force: bool = False) -> Dict[int, Dict]:
+        """Fetch the full league table once and serve it until it expires"""
+        age = time.monotonic() - self._standings_fetched_at
+        if not force and self._standings and age < self.standings_ttl:
+            return self._standings
         
-        # Fetch team statistics from standings
         endpoint = f"competitions/{self.competition_id}/standings"
-        data = await self._make_request(endpoint)
+        data = await self._make_request(endpoint, revalidate=force)
         
         if data and "standings" in data:
-            for standing_group in data["standings"]:
-                if standing_group.get("type") == "TOTAL":
-                    for table_entry in standing_group.get("table", []):
-                        if table_entry.get("team", {}).get("id") == team_id:
-                            team_data = table_entry.get("team", {})
-                            return {
-                                "team": team_data.get("name"),
-                                "matches_played": table_entry.get("playedGames", 0),
-                                "wins": table_entry.get("won", 0),
-                                "draws": table_entry.get("draw", 0),
-                                "losses": table_entry.get("lost", 0),
-                                "goals_for": table_entry.get("goalsFor", 0),
-                                "goals_against": table_entry.get("goalsAgainst", 0),
-                                "goal_diff": table_entry.get("goalDifference", 0),
-                                "points": table_entry.get("points", 0),
-                                "position": table_entry.get("position", 0),
-                                "form": table_entry.get("form", "")
-                            }
-        return None
+            standings = self._parse_standings(data)
+            if standings:
+                self._standings = standings
+                self._standings_fetched_at = time.monotonic()
+        # Fall back to the previous snapshot (possibly stale) on failure
+        return self._standings
+    
+    async def _resolve_team_id(self, team_name: str) -> Optional[int]:
+        """Resolve a team name to its API id, loading the index if needed"""
+        team_id = self.resolver.resolve(team_name)
+        if team_id is None:
+            # The standings snapshot registers all 20 teams in one request
+            await self.fetch_standings()
+            team_id = self.resolver.resolve(team_name)
+        if team_id is None and not self._standings:
+            await self.fetch_teams()
+            team_id = self.resolver.resolve(team_name)
+        return team_id
     
-    async def fetch_recent_matches(self, limit: int = 100) -> List[Dict]:
+    async def fetch_team_stats(self, team_name: str, force: bool = False) -> Optional[Dict]:
+        """Fetch statistics for a specific team (force: bypass the cached standings)"""
+        standings = await self.fetch_standings(force=force)
+        team_id = self.resolver.resolve(team_name)
+        if team_id is None or team_id not in standings:
+            return None
+        return dict(standings[team_id])
+    
+    async def fetch_recent_matches(self, limit: int = 100, force: bool = False) -> List[Dict]:
         """Fetch recent completed matches for training"""
         endpoint = f"competitions/{self.competition_id}/matches?status=FINISHED&limit={limit}"
-        data = await self._make_request(endpoint)
+        data = await self._make_request(endpoint, revalidate=force)
         
         if data and "matches" in data:
             matches = []
@@ -168,7 +319,7 @@ class DataFetcher:
     async def get_player_photo(self, player_name: str, team_name: str) -> Optional[str]:
         """Get player photo from Wikipedia/Wikimedia Commons"""
         try:
-            wiki_search_url = "https://en.wikipedia.org/api/rest_v1/page/summary/"
+            wiki_search_url = self.photo_url
             
             # Try multiple name variations for better matching
             name_parts = player_name.split()
@@ -189,56 +340,39 @@ class DataFetcher:
             if len(name_parts) >= 2:
                 name_variations.append(f"{name_parts[0]}_{name_parts[-1]}")  # "Erling_Haaland"
             
-            async with aiohttp.ClientSession() as session:
-                for wiki_name in name_variations:
-                    try:
-                        # URL encode properly
-                        encoded_name = wiki_name.replace(" ", "_")
-                        url = f"{wiki_search_url}{encoded_name}"
-                        
-                        async with session.get(
-                            url, 
-                            timeout=aiohttp.ClientTimeout(total=1.5),
-                            headers={"User-Agent": "PremierLeaguePredictor/1.0 (https://premierleaguepredictor.com)"}
-                        ) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                # Check if it's actually about a person (not a disambiguation page)
-                                if data.get("type") == "standard" and data.get("thumbnail"):
-                                    thumbnail = data.get("thumbnail", {})
-                                    if thumbnail and thumbnail.get("source"):
-                                        photo_url = thumbnail["source"]
-                                        # Make sure it's a valid image URL
-                                        if photo_url and photo_url.startswith("http"):
-                                            return photo_url
-                    except asyncio.TimeoutError:
-                        continue
-                    except Exception as e:
-                        continue
+            session = await self._get_session()
+            for wiki_name in name_variations:
+                try:
+                    # URL encode properly
+                    encoded_name = wiki_name.replace(" ", "_")
+                    url = f"{wiki_search_url}{encoded_name}"
+                    
+                    async with session.get(
+                        url, 
+                        timeout=aiohttp.ClientTimeout(total=1.5),
+                        headers={"User-Agent": "PremierLeaguePredictor/1.0 (https://premierleaguepredictor.com)"}
+                    ) as response:
+                        if response.status == 200:
+                            data = await response.json()
+                            # Check if it's actually about a person (not a disambiguation page)
+                            if data.get("type") == "standard" and data.get("thumbnail"):
+                                thumbnail = data.get("thumbnail", {})
+                                if thumbnail and thumbnail.get("source"):
+                                    photo_url = thumbnail["source"]
+                                    # Make sure it's a valid image URL
+                                    if photo_url and photo_url.startswith("http"):
+                                        return photo_url
+                except asyncio.TimeoutError:
+                    continue
+                except Exception as e:
+                    continue
         except Exception:
             pass  # Silently skip errors
         return None
     
     async def fetch_team_squad(self, team_name: str) -> List[Dict]:
         """Fetch squad/players for a specific team"""
-        # First, get the team ID
-        teams = await self.fetch_teams()
-        team_id = None
-        
-        # Normalize team name for matching
-        normalized_input = team_name.lower().replace(" fc", "").strip()
-        
-        for team in teams:
-            normalized_team_name = team["name"].lower().replace(" fc", "").strip()
-            if team["name"].lower() == team_name.lower():
-                team_id = team["id"]
-                break
-            elif normalized_team_name == normalized_input:
-                team_id = team["id"]
-                break
-            elif normalized_input in normalized_team_name or normalized_team_name in normalized_input:
-                team_id = team["id"]
-                break
+        team_id = await self._resolve_team_id(team_name)
         
         if not team_id:
             return []
@@ -0,0 +1,123 @@
+import os
+import json
+import shutil
+import hashlib
+import inspect
+from datetime import datetime
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+from data import feature_engineering, rolling_stats, stats_array, team_resolver
+from data.team_resolver import TeamResolver
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FEATURE_CACHE_DIR = os.getenv(
+    "FEATURE_CACHE_DIR", os.path.join(BACKEND_DIR, "models", "trained", "features")
+)
+# Cached datasets kept on disk; older ones are pruned on save
+FEATURE_CACHE_KEEP = int(os.getenv("FEATURE_CACHE_KEEP", "5"))
+META_FILE = "meta.json"
+
+_feature_hash: Optional[str] = None
+
+
+def feature_definition_hash() -> str:
+    """Hash of everything that shapes a feature row
+
+    Covers the feature names and the source of the stats layout, the
+    point-in-time replay, the matrix builder and the team-name resolver
+    (which decides which rows belong to one club), so editing any of them
+    invalidates cached matrices without a manual version bump.
+    """
+    global _feature_hash
+    if _feature_hash is None:
+        digest = hashlib.sha256()
+        digest.update(json.dumps(feature_engineering.FEATURE_NAMES).encode())
+        for source in (stats_array, rolling_stats, team_resolver, feature_engineering.build_feature_matrix):
+            digest.update(inspect.getsource(source).encode())
+        _feature_hash = digest.hexdigest()
+    return _feature_hash
+
+
+def matches_hash(matches: Sequence[Dict]) -> str:
+    """Hash of the training history: kickoff, teams and score of every match"""
+    digest = hashlib.sha256()
+    for match in matches:
+        digest.update("\x1f".join(str(match.get(field)) for field in (
+            'date', 'home_team', 'away_team', 'home_score', 'away_score'
+        )).encode())
+        digest.update(b"\x1e")
+    return digest.hexdigest()
+
+
+class FeatureCache:
+    """Training matrices saved as .npy files, keyed by data and feature definition
+
+    Each dataset is a directory of arrays plus meta.json. Loads memory-map
+    the arrays, so reopening even a large history costs almost nothing.
+    Datasets are written to a temporary directory and renamed into place.
+    """
+
+    def __init__(self, root: str = FEATURE_CACHE_DIR, keep: int = FEATURE_CACHE_KEEP):
+        self.root = root
+        self.keep = keep
+
+    def key(self, matches: Sequence[Dict], resolver: Optional[TeamResolver] = None) -> str:
+        """Cache key for a history, the feature code and the resolver's alias index"""
+        aliases = resolver.fingerprint() if resolver is not None else ""
+        digest = hashlib.sha256(f"{matches_hash(matches)}:{feature_definition_hash()}:{aliases}".encode())
+        return digest.hexdigest()[:16]
+
+    def load(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Memory-mapped arrays for a key, or None if not cached"""
+        directory = os.path.join(self.root, key)
+        try:
+            with open(os.path.join(directory, META_FILE)) as f:
+                meta = json.load(f)
+            arrays = {
+                name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")
+                for name in meta["arrays"]
+            }
+            # Mark as recently used so pruning keeps it
+            os.utime(directory)
+            return arrays
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, key: str, arrays: Dict[str, np.ndarray], metadata: Optional[Dict] = None):
+        os.makedirs(self.root, exist_ok=True)
+        directory = os.path.join(self.root, key)
+        if os.path.isdir(directory):
+            return
+        tmp_dir = os.path.join(self.root, f".{key}.{os.getpid()}.tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), np.ascontiguousarray(array))
+            meta = dict(metadata or {})
+            meta.update({
+                "key": key,
+                "created_at": datetime.now().isoformat(),
+                "feature_definition": feature_definition_hash(),
+                "arrays": {name: list(array.shape) for name, array in arrays.items()}
+            })
+            with open(os.path.join(tmp_dir, META_FILE), "w") as f:
+                json.dump(meta, f, indent=2)
+            os.rename(tmp_dir, directory)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            # Another run may have written the same dataset first
+            if os.path.isdir(directory):
+                return
+            raise
+        self._prune()
+
+    def _prune(self):
+        datasets = [
+            os.path.join(self.root, name) for name in os.listdir(self.root)
+            if not name.startswith(".") and os.path.isfile(os.path.join(self.root, name, META_FILE))
+        ]
+        datasets.sort(key=os.path.getmtime, reverse=True)
+        for directory in datasets[self.keep:]:
+            shutil.rmtree(directory, ignore_errors=True)
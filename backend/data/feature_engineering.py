@@ -1,136 +1,103 @@
-import asyncio
-from typing import Optional, List
+from typing import Optional, List, Sequence, Tuple
 import numpy as np
-from database.db import Database
+from database.async_db import AsyncDatabase
+from data.stats_array import (
+    POINTS, GOALS_FOR, GOALS_AGAINST, GOAL_DIFF, WINS, DRAWS, LOSSES,
+    MATCHES_PLAYED, FORM, POSITION,
+    form_to_numeric, stats_to_array
+)
+
+# Model input columns, in order. This is the single feature definition used
+# for both training and serving.
+FEATURE_NAMES = [
+    'home_points', 'away_points', 'points_diff',
+    'home_goals_for', 'away_goals_for', 'home_goals_against', 'away_goals_against',
+    'home_goal_diff', 'away_goal_diff',
+    'home_wins', 'away_wins', 'home_draws', 'away_draws', 'home_losses', 'away_losses',
+    'home_matches_played', 'away_matches_played',
+    'home_goals_per_game', 'away_goals_per_game',
+    'home_conceded_per_game', 'away_conceded_per_game',
+    'home_win_rate', 'away_win_rate',
+    'home_form', 'away_form',
+    'position_diff',
+    'home_advantage'
+]
+N_FEATURES = len(FEATURE_NAMES)
+
+
+def build_feature_matrix(team_stats: np.ndarray, pairs: np.ndarray) -> np.ndarray:
+    """Build the (n_pairs, N_FEATURES) float32 matrix for (home, away) index pairs"""
+    pairs = np.asarray(pairs, dtype=np.intp).reshape(-1, 2)
+    home = team_stats[pairs[:, 0]]
+    away = team_stats[pairs[:, 1]]
+    home_matches = np.maximum(home[:, MATCHES_PLAYED], 1)[:, None]
+    away_matches = np.maximum(away[:, MATCHES_PLAYED], 1)[:, None]
+
+    X = np.empty((len(pairs), N_FEATURES), dtype=np.float32)
+    # Points features
+    X[:, 0] = home[:, POINTS]
+    X[:, 1] = away[:, POINTS]
+    X[:, 2] = home[:, POINTS] - away[:, POINTS]
+    # Goal statistics and Win/Draw/Loss records, home and away interleaved
+    record = [GOALS_FOR, GOALS_AGAINST, GOAL_DIFF, WINS, DRAWS, LOSSES]
+    X[:, 3:15:2] = home[:, record]
+    X[:, 4:15:2] = away[:, record]
+    # Matches played
+    X[:, 15] = home[:, MATCHES_PLAYED]
+    X[:, 16] = away[:, MATCHES_PLAYED]
+    # Goals scored / conceded per game
+    X[:, 17:21:2] = home[:, [GOALS_FOR, GOALS_AGAINST]] / home_matches
+    X[:, 18:21:2] = away[:, [GOALS_FOR, GOALS_AGAINST]] / away_matches
+    # Win rate
+    X[:, 21] = home[:, WINS] / home_matches[:, 0]
+    X[:, 22] = away[:, WINS] / away_matches[:, 0]
+    # Form (last 5 matches)
+    X[:, 23] = home[:, FORM]
+    X[:, 24] = away[:, FORM]
+    # Position difference
+    X[:, 25] = home[:, POSITION] - away[:, POSITION]
+    # Home advantage (always 1 for home team)
+    X[:, 26] = 1.0
+    return X
+
 
 class FeatureEngineer:
     """Creates features for ML models from match and team data"""
-    
+
     def __init__(self):
-        self.db = Database()
-    
+        self.db = AsyncDatabase()
+
     async def get_match_features(self, home_team: str, away_team: str) -> Optional[List[float]]:
         """Extract features for a match prediction"""
-        home_stats = self.db.get_team_stats(home_team)
-        away_stats = self.db.get_team_stats(away_team)
-        
-        if not home_stats or not away_stats:
-            return None
-        
-        features = []
-        
-        # Points features
-        features.append(home_stats.get('points', 0))
-        features.append(away_stats.get('points', 0))
-        features.append(home_stats.get('points', 0) - away_stats.get('points', 0))
-        
-        # Goal statistics
-        features.append(home_stats.get('goals_for', 0))
-        features.append(away_stats.get('goals_for', 0))
-        features.append(home_stats.get('goals_against', 0))
-        features.append(away_stats.get('goals_against', 0))
-        features.append(home_stats.get('goal_diff', 0))
-        features.append(away_stats.get('goal_diff', 0))
-        
-        # Win/Draw/Loss records
-        features.append(home_stats.get('wins', 0))
-        features.append(away_stats.get('wins', 0))
-        features.append(home_stats.get('draws', 0))
-        features.append(away_stats.get('draws', 0))
-        features.append(home_stats.get('losses', 0))
-        features.append(away_stats.get('losses', 0))
-        
-        # Matches played
-        home_matches = home_stats.get('matches_played', 1)
-        away_matches = away_stats.get('matches_played', 1)
-        features.append(home_matches)
-        features.append(away_matches)
-        
-        # Goals per game
-        features.append(home_stats.get('goals_for', 0) / max(home_matches, 1))
-        features.append(away_stats.get('goals_for', 0) / max(away_matches, 1))
-        features.append(home_stats.get('goals_against', 0) / max(home_matches, 1))
-        features.append(away_stats.get('goals_against', 0) / max(away_matches, 1))
-        
-        # Win rate
-        features.append(home_stats.get('wins', 0) / max(home_matches, 1))
-        features.append(away_stats.get('wins', 0) / max(away_matches, 1))
-        
-        # Form (last 5 matches) - convert to numeric
-        home_form = self._form_to_numeric(home_stats.get('form', ''))
-        away_form = self._form_to_numeric(away_stats.get('form', ''))
-        features.append(home_form)
-        features.append(away_form)
-        
-        # Position difference
-        features.append(home_stats.get('position', 20) - away_stats.get('position', 20))
-        
-        # Home advantage (always 1 for home team)
-        features.append(1.0)
-        
-        return features
+        row = await self.get_match_row(home_team, away_team)
+        return row[0].tolist() if row is not None else None
     
+    async def get_match_row(self, home_team: str, away_team: str) -> Optional[np.ndarray]:
+        """Features for one match as a (1, N_FEATURES) float32 array"""
+        X, valid = await self.get_fixture_matrix([(home_team, away_team)])
+        return X[:1] if valid[0] else None
+
+    async def get_fixture_matrix(self, fixtures: Sequence[Tuple[str, str]]) -> Tuple[np.ndarray, np.ndarray]:
+        """Feature matrix for many fixtures, straight from the in-memory stats array
+
+        Returns the matrix and a boolean mask of fixtures whose teams both
+        have stats; rows where the mask is False are not meaningful.
+        """
+        teams = sorted({team for fixture in fixtures for team in fixture})
+        snapshot, rows = self.db.get_stats_rows(teams)
+        row_of = dict(zip(teams, rows))
+
+        pairs = np.array([(row_of[home], row_of[away]) for home, away in fixtures], dtype=np.intp)
+        valid = (pairs >= 0).all(axis=1)
+        if not len(snapshot.keys):
+            return np.zeros((len(fixtures), N_FEATURES), dtype=np.float32), valid
+        # Unknown teams (-1) index a real row; the mask marks those fixtures invalid
+        return build_feature_matrix(snapshot.array, pairs), valid
+
     def _form_to_numeric(self, form_string: str) -> float:
         """Convert form string (e.g., 'WWDLW') to numeric value"""
-        if not form_string:
-            return 0.5
-        
-        form_points = {'W': 3, 'D': 1, 'L': 0}
-        total_points = sum(form_points.get(char, 0) for char in form_string[:5])
-        return total_points / (len(form_string[:5]) * 3) if form_string else 0.5
-    
+        return form_to_numeric(form_string)
+
     def extract_features_from_match(self, match: dict, home_stats: dict, away_stats: dict) -> List[float]:
         """Extract features from a historical match for training"""
-        features = []
-        
-        # Points features
-        features.append(home_stats.get('points', 0))
-        features.append(away_stats.get('points', 0))
-        features.append(home_stats.get('points', 0) - away_stats.get('points', 0))
-        
-        # Goal statistics
-        features.append(home_stats.get('goals_for', 0))
-        features.append(away_stats.get('goals_for', 0))
-        features.append(home_stats.get('goals_against', 0))
-        features.append(away_stats.get('goals_against', 0))
-        features.append(home_stats.get('goal_diff', 0))
-        features.append(away_stats.get('goal_diff', 0))
-        
-        # Win/Draw/Loss records
-        features.append(home_stats.get('wins', 0))
-        features.append(away_stats.get('wins', 0))
-        features.append(home_stats.get('draws', 0))
-        features.append(away_stats.get('draws', 0))
-        features.append(home_stats.get('losses', 0))
-        features.append(away_stats.get('losses', 0))
-        
-        # Matches played
-        home_matches = home_stats.get('matches_played', 1)
-        away_matches = away_stats.get('matches_played', 1)
-        features.append(home_matches)
-        features.append(away_matches)
-        
-        # Goals per game
-        features.append(home_stats.get('goals_for', 0) / max(home_matches, 1))
-        features.append(away_stats.get('goals_for', 0) / max(away_matches, 1))
-        features.append(home_stats.get('goals_against', 0) / max(home_matches, 1))
-        features.append(away_stats.get('goals_against', 0) / max(away_matches, 1))
-        
-        # Win rate
-        features.append(home_stats.get('wins', 0) / max(home_matches, 1))
-        features.append(away_stats.get('wins', 0) / max(away_matches, 1))
-        
-        # Form
-        home_form = self._form_to_numeric(home_stats.get('form', ''))
-        away_form = self._form_to_numeric(away_stats.get('form', ''))
-        features.append(home_form)
-        features.append(away_form)
-        
-        # Position difference
-        features.append(home_stats.get('position', 20) - away_stats.get('position', 20))
-        
-        # Home advantage
-        features.append(1.0)
-        
-        return features
-
+        return build_feature_matrix(stats_to_array([home_stats, away_stats]), [(0, 1)])[0].tolist()
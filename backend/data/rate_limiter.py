@@ -0,0 +1,131 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Dict, List, Optional
+
+# Request priorities, most urgent first
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+PRIORITY_TRAINING = 2
+
+# football-data.org free tier: 10 requests per minute
+UPSTREAM_RATE_PER_MINUTE = float(os.getenv("UPSTREAM_RATE_PER_MINUTE", "10"))
+UPSTREAM_BURST = int(os.getenv("UPSTREAM_BURST", "10"))
+# Longest a caller queues for a token before giving up, by priority
+UPSTREAM_MAX_WAIT = {
+    PRIORITY_USER: float(os.getenv("UPSTREAM_USER_WAIT", "2")),
+    PRIORITY_BACKGROUND: float(os.getenv("UPSTREAM_BACKGROUND_WAIT", "60")),
+    PRIORITY_TRAINING: float(os.getenv("UPSTREAM_TRAINING_WAIT", "300")),
+}
+
+
+class TokenBucketLimiter:
+    """Token bucket with a priority queue of waiters
+
+    Tokens refill continuously at `rate_per_minute` up to `capacity`. A caller
+    takes a token immediately when one is free and nobody is queued;
+    otherwise it queues, and tokens are handed out lowest priority value
+    first (FIFO within a priority). acquire() returns False if no token came
+    within the caller's wait, so it can fall back to cached data.
+    """
+
+    def __init__(self, rate_per_minute: float = UPSTREAM_RATE_PER_MINUTE, capacity: int = UPSTREAM_BURST):
+        if rate_per_minute <= 0 or capacity < 1:
+            raise ValueError(f"Rate limit needs a positive rate and capacity, got "
+                             f"{rate_per_minute}/min with capacity {capacity}")
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._waiters: List = []
+        self._order = itertools.count()
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.granted = 0
+        self.timed_out = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        if now >= self._paused_until:
+            start = max(self._updated, self._paused_until)
+            self.tokens = min(self.capacity, self.tokens + (now - start) * self.rate)
+        self._updated = now
+
+    def pause(self, seconds: float):
+        """Empty the bucket and hold refills (upstream answered 429)"""
+        self.tokens = 0.0
+        self._updated = time.monotonic()
+        self._paused_until = max(self._paused_until, self._updated + seconds)
+
+    def _bind_loop(self):
+        """Drop the timer and queue if they belong to another event loop
+
+        The limiter is process-wide, but waiter futures and the dispatch
+        timer are tied to the loop that created them (e.g. an earlier
+        asyncio.run in a script); carrying them over would stall dispatch.
+        """
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            if self._timer is not None:
+                self._timer.cancel()
+            self._timer = None
+            self._waiters = []
+            self._loop = loop
+
+    def _dispatch(self):
+        self._timer = None
+        self._refill()
+        while self._waiters and self.tokens >= 1:
+            _, _, future = heapq.heappop(self._waiters)
+            if future.done():  # gave up waiting
+                continue
+            self.tokens -= 1
+            future.set_result(True)
+        # Drop abandoned waiters so they don't keep the timer alive
+        while self._waiters and self._waiters[0][2].done():
+            heapq.heappop(self._waiters)
+        if self._waiters:
+            now = time.monotonic()
+            delay = max(self._paused_until - now, 0.0) + (1 - self.tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._dispatch)
+
+    async def acquire(self, priority: int = PRIORITY_USER, timeout: Optional[float] = None) -> bool:
+        """Wait for a token; False if none was granted within timeout seconds"""
+        if timeout is None:
+            timeout = UPSTREAM_MAX_WAIT.get(priority, UPSTREAM_MAX_WAIT[PRIORITY_USER])
+        self._bind_loop()
+        self._refill()
+        if not self._waiters and self.tokens >= 1:
+            self.tokens -= 1
+            self.granted += 1
+            return True
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        if self._timer is None:
+            self._dispatch()
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            return False
+        self.granted += 1
+        return True
+
+    def stats(self) -> Dict:
+        self._refill()
+        return {
+            "tokens": round(self.tokens, 2),
+            "rate_per_minute": self.rate * 60,
+            "queued": sum(1 for _, _, future in self._waiters if not future.done()),
+            "granted": self.granted,
+            "timed_out": self.timed_out,
+            "paused_for": max(self._paused_until - time.monotonic(), 0.0)
+        }
+
+
+# One bucket per process: every DataFetcher shares the upstream quota
+upstream_limiter = TokenBucketLimiter()
@@ -0,0 +1,197 @@
+import os
+import time
+import asyncio
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from data.data_fetcher import DataFetcher
+from data.rate_limiter import PRIORITY_BACKGROUND
+from database.async_db import AsyncDatabase
+
+# Set to 0 to disable background refresh (handlers then fetch on demand)
+REFRESH_ENABLED = os.getenv("REFRESH_ENABLED", "1") != "0"
+
+# Seconds between refreshes of each resource: (normal, on a matchday)
+REFRESH_INTERVALS = {
+    "fixtures": (float(os.getenv("REFRESH_FIXTURES_INTERVAL", "3600")),
+                 float(os.getenv("REFRESH_FIXTURES_MATCHDAY_INTERVAL", "600"))),
+    "teams": (float(os.getenv("REFRESH_TEAMS_INTERVAL", "86400")),) * 2,
+    "standings": (float(os.getenv("REFRESH_STANDINGS_INTERVAL", "1800")),
+                  float(os.getenv("REFRESH_STANDINGS_MATCHDAY_INTERVAL", "300"))),
+    "squads": (float(os.getenv("REFRESH_SQUADS_INTERVAL", "86400")),) * 2,
+}
+# Finished matches pulled with each fixtures refresh, so results land promptly
+REFRESH_RESULTS_LIMIT = int(os.getenv("REFRESH_RESULTS_LIMIT", "50"))
+# A fixture is served until this long after kickoff; by then the result refresh has it
+FIXTURE_GRACE = timedelta(hours=3)
+# How often sleeping jobs re-check their interval (it shrinks when a matchday starts)
+REFRESH_TICK = 60.0
+# Requested refreshes (e.g. /api/stats?refresh=true) reuse a run this recent
+REFRESH_ON_DEMAND_MIN_AGE = float(os.getenv("REFRESH_ON_DEMAND_MIN_AGE", "60"))
+
+
+def fixtures_since(now: Optional[datetime] = None) -> str:
+    """Cut-off (ISO UTC, as stored) for fixtures that are still upcoming or in play"""
+    now = now or datetime.now(timezone.utc)
+    return (now - FIXTURE_GRACE).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+async def upcoming_fixtures(db: AsyncDatabase, data_fetcher: DataFetcher) -> List[Dict]:
+    """Scheduled fixtures: stored ones when refreshing in the background, else from the API"""
+    if REFRESH_ENABLED:
+        return await db.get_scheduled_matches(fixtures_since())
+    return await data_fetcher.fetch_upcoming_matches()
+
+
+class RefreshScheduler:
+    """Keeps teams, standings, fixtures and squads in the database current
+
+    One pass refreshes everything in dependency order at startup; after that
+    each resource refreshes on its own interval, shorter on matchdays (any
+    fixture kicking off today, UTC). Upstream calls go through a dedicated
+    fetcher at background priority, so they queue behind user requests for
+    the shared rate limit. Handlers read the database only; `ready` turns
+    True once the first pass has finished.
+    """
+
+    def __init__(self, db: Optional[AsyncDatabase] = None, data_fetcher: Optional[DataFetcher] = None,
+                 enabled: bool = REFRESH_ENABLED):
+        self.db = db or AsyncDatabase()
+        self.data_fetcher = data_fetcher or DataFetcher(priority=PRIORITY_BACKGROUND, resolver=self.db.resolver)
+        self.enabled = enabled
+        self.jobs = {
+            "fixtures": self.refresh_fixtures,
+            "teams": self.refresh_teams,
+            "standings": self.refresh_standings,
+            "squads": self.refresh_squads,
+        }
+        self.status: Dict[str, Dict] = {name: {"runs": 0, "errors": 0, "last_run": None} for name in self.jobs}
+        # Job -> monotonic time its last run finished, and runs in progress
+        self.refreshed_at: Dict[str, float] = {}
+        self._running: Dict[str, asyncio.Future] = {}
+        self._kickoff_days: set = set()
+        self.ready = False
+        self._task: Optional[asyncio.Task] = None
+
+    def is_matchday(self) -> bool:
+        return datetime.now(timezone.utc).date() in self._kickoff_days
+
+    def interval(self, name: str) -> float:
+        normal, matchday = REFRESH_INTERVALS[name]
+        return matchday if self.is_matchday() else normal
+
+    async def refresh_fixtures(self) -> int:
+        """Scheduled fixtures, plus recent results so finished matches flip status"""
+        upcoming, results = await asyncio.gather(
+            self.data_fetcher.fetch_upcoming_matches(force=True),
+            self.data_fetcher.fetch_recent_matches(limit=REFRESH_RESULTS_LIMIT, force=True)
+        )
+        if results:
+            await self.db.save_matches(results)
+        if upcoming:
+            await self.db.replace_scheduled_matches(upcoming)
+            # Keep today once seen: fixtures in play drop out of the SCHEDULED list
+            today = datetime.now(timezone.utc).date()
+            self._kickoff_days = {
+                datetime.fromisoformat(match["date"].replace("Z", "+00:00")).date()
+                for match in upcoming if match.get("date")
+            } | {day for day in self._kickoff_days if day >= today}
+        return len(upcoming)
+
+    async def refresh_teams(self) -> int:
+        teams = await self.data_fetcher.fetch_teams()
+        if teams:
+            await self.db.save_teams(teams)
+        return len(teams)
+
+    async def refresh_standings(self) -> int:
+        standings = await self.data_fetcher.fetch_standings(force=True)
+        if standings:
+            await self.db.save_team_stats_bulk(list(standings.values()))
+        return len(standings)
+
+    async def refresh_squads(self) -> int:
+        """One team at a time; the rate limiter paces the upstream calls"""
+        refreshed = 0
+        for team in await self.db.get_teams():
+            players = await self.data_fetcher.fetch_team_squad(team["name"])
+            if players:
+                await self.db.save_team_players(team["name"], players)
+                refreshed += 1
+        return refreshed
+
+    async def refresh(self, name: str):
+        """Run one job; concurrent calls for the same job share one run"""
+        task = self._running.get(name)
+        if task is None:
+            task = asyncio.ensure_future(self._run_job(name))
+            self._running[name] = task
+            task.add_done_callback(lambda _: self._running.pop(name, None))
+        # Shielded so one cancelled caller doesn't cancel the run for the others
+        await asyncio.shield(task)
+    
+    async def refresh_if_older(self, name: str, max_age: float = REFRESH_ON_DEMAND_MIN_AGE):
+        """Refresh on request, unless a run finished less than max_age seconds ago
+        
+        Keeps client-requested refreshes from spending the upstream quota:
+        however many arrive, each job goes upstream at most once per max_age.
+        """
+        if time.monotonic() - self.refreshed_at.get(name, float("-inf")) >= max_age:
+            await self.refresh(name)
+    
+    async def _run_job(self, name: str):
+        """Run one job, recording the outcome; errors never stop the schedule"""
+        entry = self.status[name]
+        start = time.perf_counter()
+        try:
+            entry["items"] = await self.jobs[name]()
+        except Exception as e:
+            entry["errors"] += 1
+            print(f"Background refresh of {name} failed: {e}")
+        entry["runs"] += 1
+        entry["last_run"] = datetime.now().isoformat()
+        entry["seconds"] = round(time.perf_counter() - start, 3)
+        self.refreshed_at[name] = time.monotonic()
+
+    async def _every(self, name: str):
+        last = time.monotonic()
+        while True:
+            await asyncio.sleep(min(self.interval(name), REFRESH_TICK))
+            if time.monotonic() - last >= self.interval(name):
+                await self.refresh(name)
+                last = time.monotonic()
+
+    async def run(self):
+        # Initial pass in order: squads need teams, matchday detection needs fixtures
+        for name in self.jobs:
+            await self.refresh(name)
+        self.ready = True
+        await asyncio.gather(*[self._every(name) for name in self.jobs])
+
+    async def start(self):
+        """Open the fetcher's session and start refreshing (called on app startup)"""
+        if not self.enabled or self._task is not None:
+            return
+        await self.data_fetcher.start()
+        self._task = asyncio.create_task(self.run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.data_fetcher.close()
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.enabled,
+            "ready": self.ready,
+            "matchday": self.is_matchday(),
+            "jobs": {
+                name: dict(entry, interval=self.interval(name))
+                for name, entry in self.status.items()
+            }
+        }
@@ -0,0 +1,141 @@
+import os
+import re
+import json
+import time
+import asyncio
+import hashlib
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HTTP_CACHE_DIR = os.getenv("HTTP_CACHE_DIR", os.path.join(BACKEND_DIR, "data", "cache", "http"))
+# Seconds a cached response is served without contacting upstream, for
+# endpoints not listed in RESPONSE_TTLS
+HTTP_CACHE_TTL = float(os.getenv("HTTP_CACHE_TTL", "300"))
+
+# Endpoint pattern -> freshness window in seconds. Club lists and squads
+# change a few times a season; standings and fixtures on matchdays.
+RESPONSE_TTLS = [
+    (re.compile(r"^competitions/\w+/teams$"), 24 * 3600),
+    (re.compile(r"^teams/\d+$"), 24 * 3600),
+    (re.compile(r"^competitions/\w+/standings$"), 600),
+    (re.compile(r"^competitions/\w+/matches\?status=SCHEDULED"), 600),
+    (re.compile(r"^competitions/\w+/matches\?status=FINISHED"), 3600),
+]
+
+
+class ResponseCache:
+    """Upstream JSON responses persisted on disk, keyed by endpoint
+
+    Each entry keeps the body, when it was fetched, and the ETag /
+    Last-Modified validators, so an expired entry can be revalidated with a
+    conditional request and reused on 304 Not Modified. Entries are held in
+    memory once read; files are read and written on a worker thread and
+    replaced atomically.
+    """
+
+    def __init__(self, directory: str = HTTP_CACHE_DIR, default_ttl: float = HTTP_CACHE_TTL):
+        self.directory = directory
+        self.default_ttl = default_ttl
+        self._entries: Dict[str, Optional[Dict]] = {}
+
+    def ttl_for(self, endpoint: str) -> float:
+        for pattern, ttl in RESPONSE_TTLS:
+            if pattern.search(endpoint):
+                return ttl
+        return self.default_ttl
+
+    def is_fresh(self, endpoint: str, entry: Dict) -> bool:
+        return time.time() - entry["fetched_at"] < self.ttl_for(endpoint)
+
+    def _path(self, endpoint: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(endpoint.encode()).hexdigest() + ".json")
+
+    def _read(self, endpoint: str) -> Optional[Dict]:
+        try:
+            with open(self._path(endpoint)) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return entry if entry.get("endpoint") == endpoint else None
+
+    def _write(self, entry: Dict):
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._path(entry["endpoint"])
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+    async def get(self, endpoint: str) -> Optional[Dict]:
+        """Cached entry (fresh or not) for an endpoint, or None"""
+        if endpoint not in self._entries:
+            loop = asyncio.get_running_loop()
+            self._entries[endpoint] = await loop.run_in_executor(None, self._read, endpoint)
+        return self._entries[endpoint]
+
+    async def put(self, endpoint: str, body, etag: Optional[str] = None,
+                  last_modified: Optional[str] = None) -> Dict:
+        entry = {
+            "endpoint": endpoint,
+            "fetched_at": time.time(),
+            "etag": etag,
+            "last_modified": last_modified,
+            "body": body
+        }
+        await self._store(entry)
+        return entry
+
+    async def touch(self, endpoint: str, entry: Dict):
+        """Mark an entry as just revalidated (upstream answered 304)"""
+        await self._store(dict(entry, fetched_at=time.time()))
+
+    async def _store(self, entry: Dict):
+        self._entries[entry["endpoint"]] = entry
+        loop = asyncio.get_running_loop()
+        try:
+            await loop.run_in_executor(None, self._write, entry)
+        except OSError as e:
+            # The in-memory copy still serves this process
+            print(f"Could not persist cached response for {entry['endpoint']}: {e}")
+
+
+class StaleResponses:
+    """Endpoints whose last answer was a cached body served in place of the API
+
+    Each entry holds when that body was fetched; it is cleared once the API
+    answers the endpoint again. One registry per process, so fetchers used
+    by the background refresh and by handlers report into the same place.
+    """
+
+    def __init__(self):
+        self._fetched_at: Dict[str, float] = {}
+        self.served = 0
+
+    def __contains__(self, endpoint: str) -> bool:
+        return endpoint in self._fetched_at
+
+    def mark(self, endpoint: str, fetched_at: float):
+        self._fetched_at[endpoint] = fetched_at
+        self.served += 1
+
+    def clear(self, endpoint: str):
+        self._fetched_at.pop(endpoint, None)
+
+    def oldest(self, endpoints: Iterable[str]) -> Optional[float]:
+        """Fetch time of the oldest stale body among these endpoints, or None if all are live"""
+        times = [self._fetched_at[endpoint] for endpoint in endpoints if endpoint in self._fetched_at]
+        return min(times) if times else None
+
+    def stats(self) -> Dict:
+        return {
+            "stale_served": self.served,
+            "stale_endpoints": {
+                endpoint: datetime.fromtimestamp(fetched_at, timezone.utc).isoformat()
+                for endpoint, fetched_at in sorted(self._fetched_at.items())
+            }
+        }
+
+
+# One registry per process: every DataFetcher reports stale serves here
+stale_responses = StaleResponses()
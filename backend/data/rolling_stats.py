@@ -0,0 +1,180 @@
+from collections import deque
+from datetime import date, datetime
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+import numpy as np
+
+from data.feature_engineering import build_feature_matrix
+from data.stats_array import STAT_COLUMNS, FORM, FORM_LENGTH, POSITION, form_value
+from data.team_resolver import TeamResolver
+
+
+def season_of(match: Dict) -> Hashable:
+    """Season a match belongs to: its 'season' field, else the year the season started
+
+    Premier League seasons start in August, so July and later count towards
+    the season starting that year.
+    """
+    season = match.get('season')
+    if season is not None:
+        return season
+    kickoff = match.get('date')
+    if isinstance(kickoff, (datetime, date)):
+        year, month = kickoff.year, kickoff.month
+    elif kickoff:
+        year, month = int(str(kickoff)[:4]), int(str(kickoff)[5:7])
+    else:
+        return None
+    return year if month >= 7 else year - 1
+
+
+# Column of the running totals bumped by a result worth this many points
+_RESULT_COLUMN = {3: 4, 1: 5, 0: 6}
+
+
+# Without a populated index, team keys are normalized full club names
+_NO_TEAMS = TeamResolver()
+
+
+def match_key(match: Dict, resolver: Optional[TeamResolver] = None) -> Tuple[str, Hashable, Hashable]:
+    """Natural key of a match: kickoff day plus home and away team keys
+
+    Teams are keyed by TeamResolver.team_key (team id when the resolver
+    knows the club, else the normalized full name, with CSV archive
+    spellings expanded), so the same fixture from the API and from an
+    archive gets the same key. Without a resolver the key depends only on
+    the match itself, which keeps it stable for ids derived from it.
+    """
+    resolver = resolver or _NO_TEAMS
+    return (
+        _sort_key(match)[:10],
+        resolver.team_key(match['home_team']),
+        resolver.team_key(match['away_team'])
+    )
+
+
+def dedupe_matches(matches: Sequence[Dict], resolver: Optional[TeamResolver] = None) -> List[Dict]:
+    """Drop repeated fixtures (by match_key), keeping the first occurrence"""
+    seen = set()
+    unique = []
+    for match in matches:
+        key = match_key(match, resolver)
+        if key not in seen:
+            seen.add(key)
+            unique.append(match)
+    return unique
+
+
+def _rank_key(points: int, goal_diff: int, goals_for: int) -> float:
+    # Points, then goal difference, then goals scored; exact in float64 for
+    # any realistic season totals
+    return points * 1e8 + (goal_diff + 5000) * 1e4 + goals_for
+
+
+def _sort_key(match: Dict) -> str:
+    kickoff = match.get('date')
+    return kickoff.isoformat() if isinstance(kickoff, (datetime, date)) else str(kickoff or '')
+
+
+class RollingTeamStats:
+    """Replays finished matches in kickoff order, keeping each team's table row
+
+    For every match the home and away rows are recorded *before* the result
+    is applied, so each row only reflects matches played earlier that season.
+    Rows use the STAT_COLUMNS layout, so they feed build_feature_matrix the
+    same way the live stats table does. Totals reset at every season
+    boundary; position is the team's rank (points, goal difference, goals
+    scored) among that season's teams at kickoff.
+    """
+
+    def __init__(self, form_length: int = FORM_LENGTH, resolver: Optional[TeamResolver] = None):
+        self.form_length = form_length
+        # Teams are tracked by TeamResolver.team_key, so one club spelled
+        # differently across sources is still one team
+        self.resolver = resolver or _NO_TEAMS
+
+    def replay(self, matches: Sequence[Dict]) -> Tuple[np.ndarray, np.ndarray, List[Dict]]:
+        """As-of-kickoff (home_rows, away_rows, matches) for every finished match
+
+        Matches without a score are skipped; the returned matches are the
+        kept ones in replay order, aligned with the rows.
+        """
+        played = sorted(
+            (m for m in matches
+             if m.get('home_score') is not None and m.get('away_score') is not None),
+            key=_sort_key
+        )
+
+        # Team slots, and which teams take part in each season (for positions)
+        slot: Dict[Hashable, int] = {}
+        season_teams: Dict[Hashable, set] = {}
+        home_slots, away_slots, seasons = [], [], []
+        for match in played:
+            home = slot.setdefault(self.resolver.team_key(match['home_team']), len(slot))
+            away = slot.setdefault(self.resolver.team_key(match['away_team']), len(slot))
+            home_slots.append(home)
+            away_slots.append(away)
+            season = season_of(match)
+            seasons.append(season)
+            season_teams.setdefault(season, set()).update((home, away))
+
+        n_teams = len(slot)
+        # Running totals per team: points, goals for, goals against, goal
+        # difference, wins, draws, losses (the first STAT_COLUMNS)
+        totals = [[0] * 7 for _ in range(n_teams)]
+        form = [deque(maxlen=self.form_length) for _ in range(n_teams)]
+        # Table order folded into one sortable number per team; teams outside
+        # the current season sit at -inf so they never rank ahead
+        rank_key = np.full(n_teams, -np.inf)
+        current_season = object()
+
+        rows = np.empty((2, len(played), len(STAT_COLUMNS)), dtype=np.float32)
+        for i, match in enumerate(played):
+            if seasons[i] != current_season:
+                current_season = seasons[i]
+                for team_totals in totals:
+                    team_totals[:] = [0] * 7
+                for results in form:
+                    results.clear()
+                rank_key[:] = -np.inf
+                rank_key[list(season_teams[current_season])] = _rank_key(0, 0, 0)
+
+            home, away = home_slots[i], away_slots[i]
+            for side, team in enumerate((home, away)):
+                team_totals = totals[team]
+                recent = form[team]
+                row = rows[side, i]
+                row[:FORM] = team_totals + [team_totals[4] + team_totals[5] + team_totals[6]]
+                row[FORM] = form_value(recent)
+                row[POSITION] = 1 + np.count_nonzero(rank_key > rank_key[team])
+
+            # Apply the result
+            home_goals, away_goals = match['home_score'], match['away_score']
+            if home_goals > away_goals:
+                home_points, away_points = 3, 0
+            elif home_goals < away_goals:
+                home_points, away_points = 0, 3
+            else:
+                home_points = away_points = 1
+            for team, scored, conceded, earned in (
+                (home, home_goals, away_goals, home_points),
+                (away, away_goals, home_goals, away_points)
+            ):
+                team_totals = totals[team]
+                team_totals[0] += earned
+                team_totals[1] += scored
+                team_totals[2] += conceded
+                team_totals[3] += scored - conceded
+                team_totals[_RESULT_COLUMN[earned]] += 1
+                form[team].append(earned)
+                rank_key[team] = _rank_key(team_totals[0], team_totals[3], team_totals[1])
+
+        return rows[0], rows[1], played
+
+
+def point_in_time_features(matches: Sequence[Dict],
+                           engine: Optional[RollingTeamStats] = None) -> Tuple[np.ndarray, List[Dict]]:
+    """Training feature matrix built from as-of-kickoff stats, plus the kept matches"""
+    home_rows, away_rows, played = (engine or RollingTeamStats()).replay(matches)
+    n = len(played)
+    pairs = np.column_stack([np.arange(n), np.arange(n, 2 * n)])
+    return build_feature_matrix(np.concatenate([home_rows, away_rows]), pairs), played
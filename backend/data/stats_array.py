@@ -0,0 +1,44 @@
+from typing import Dict, Sequence
+import numpy as np
+
+# Per-team stat columns of the team-stats array, with defaults for missing keys
+STAT_COLUMNS = [
+    'points', 'goals_for', 'goals_against', 'goal_diff', 'wins', 'draws',
+    'losses', 'matches_played', 'form', 'position'
+]
+STAT_DEFAULTS = {'matches_played': 1, 'position': 20}
+(POINTS, GOALS_FOR, GOALS_AGAINST, GOAL_DIFF, WINS, DRAWS,
+ LOSSES, MATCHES_PLAYED, FORM, POSITION) = range(len(STAT_COLUMNS))
+
+
+# Recent results counted towards form, and the points each is worth
+FORM_LENGTH = 5
+FORM_POINTS = {'W': 3, 'D': 1, 'L': 0}
+
+
+def form_value(points: Sequence[int]) -> float:
+    """Share of the available points taken in recent matches (0.5 with none)"""
+    return sum(points) / (3 * len(points)) if points else 0.5
+
+
+def form_to_numeric(form_string: str) -> float:
+    """Convert form string (e.g., 'W,W,D,L,W' or 'WWDLW', latest first) to numeric value
+
+    Separators are skipped, so the last FORM_LENGTH results count whatever
+    the spelling; training computes the same form_value from replayed points.
+    """
+    results = [char for char in (form_string or '').upper() if char in FORM_POINTS]
+    return form_value([FORM_POINTS[result] for result in results[:FORM_LENGTH]])
+
+
+def stats_to_array(stats_list: Sequence[Dict]) -> np.ndarray:
+    """Stack team stats dicts into a (teams x STAT_COLUMNS) float32 array"""
+    array = np.empty((len(stats_list), len(STAT_COLUMNS)), dtype=np.float32)
+    for i, stats in enumerate(stats_list):
+        for j, column in enumerate(STAT_COLUMNS):
+            if column == 'form':
+                array[i, j] = form_to_numeric(stats.get('form', ''))
+            else:
+                value = stats.get(column, STAT_DEFAULTS.get(column, 0))
+                array[i, j] = value if value is not None else STAT_DEFAULTS.get(column, 0)
+    return array
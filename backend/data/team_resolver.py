@@ -0,0 +1,179 @@
+import re
+import json
+import hashlib
+import threading
+from typing import Dict, Iterable, List, Optional, Set
+
+# Tokens dropped or rewritten before hashing a team name
+_DROP_TOKENS = {"fc", "afc"}
+_TOKEN_REWRITES = {"utd": "united", "&": "and"}
+_NON_ALNUM = re.compile(r"[^a-z0-9& ]+")
+
+
+def normalize_team_name(name: str) -> str:
+    """Normalize a team name for lookups ("Man Utd FC" -> "manchester united")"""
+    if not name:
+        return ""
+    text = name.lower().replace("_", " ").replace("-", " ").replace(".", "")
+    text = _NON_ALNUM.sub(" ", text)
+    tokens = []
+    for token in text.split():
+        if token in _DROP_TOKENS:
+            continue
+        tokens.append(_TOKEN_REWRITES.get(token, token))
+    # "Man City" / "Man United" style abbreviations
+    if len(tokens) > 1 and tokens[0] == "man":
+        tokens[0] = "manchester"
+    return " ".join(tokens)
+
+
+# Short club names used by football-data.co.uk CSV archives -> full names
+# as football-data.org spells them (before the FC/AFC suffix)
+ARCHIVE_TEAM_NAMES = {
+    "Birmingham": "Birmingham City",
+    "Blackburn": "Blackburn Rovers",
+    "Bolton": "Bolton Wanderers",
+    "Bradford": "Bradford City",
+    "Brighton": "Brighton & Hove Albion",
+    "Cardiff": "Cardiff City",
+    "Charlton": "Charlton Athletic",
+    "Coventry": "Coventry City",
+    "Derby": "Derby County",
+    "Huddersfield": "Huddersfield Town",
+    "Hull": "Hull City",
+    "Ipswich": "Ipswich Town",
+    "Leeds": "Leeds United",
+    "Leicester": "Leicester City",
+    "Luton": "Luton Town",
+    "Man City": "Manchester City",
+    "Man United": "Manchester United",
+    "Newcastle": "Newcastle United",
+    "Norwich": "Norwich City",
+    "Nott'm Forest": "Nottingham Forest",
+    "QPR": "Queens Park Rangers",
+    "Sheffield Weds": "Sheffield Wednesday",
+    "Stoke": "Stoke City",
+    "Swansea": "Swansea City",
+    "Tottenham": "Tottenham Hotspur",
+    "West Brom": "West Bromwich Albion",
+    "West Ham": "West Ham United",
+    "Wigan": "Wigan Athletic",
+    "Wolves": "Wolverhampton Wanderers",
+}
+_ARCHIVE_NAMES_BY_KEY = {normalize_team_name(short): full for short, full in ARCHIVE_TEAM_NAMES.items()}
+
+
+def archive_team_name(name: str) -> str:
+    """Full club name for a CSV archive spelling ("Nott'm Forest" -> "Nottingham Forest")"""
+    return _ARCHIVE_NAMES_BY_KEY.get(normalize_team_name(name), name)
+
+
+class TeamResolver:
+    """In-memory index mapping team names, short names and TLAs to team ids"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._aliases: Dict[str, int] = {}
+        # Aliases from the API (name, short name, TLA) or persisted from it;
+        # the only ones handed out for storage
+        self._team_aliases: Dict[str, int] = {}
+        self._canonical: Dict[int, str] = {}
+        self._names: Dict[int, Set[str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._canonical)
+
+    def add_team(self, team_id: int, name: str, aliases: Iterable[Optional[str]] = ()):
+        """Register a team under its canonical name and any aliases"""
+        if team_id is None or not name:
+            return
+        with self._lock:
+            self._canonical[team_id] = name
+            self._names.setdefault(team_id, set()).add(name)
+            for alias in (name, *aliases):
+                key = normalize_team_name(alias) if alias else ""
+                if not key:
+                    continue
+                previous = self._aliases.get(key)
+                if previous is not None and previous != team_id:
+                    # Same team re-registered under a new id: keep its old spellings
+                    self._names[team_id].update(self._names.get(previous, ()))
+                self._aliases[key] = team_id
+                self._team_aliases[key] = team_id
+
+    def add_alias(self, alias: str, team_id: int, raw_name: bool = False):
+        """Map an extra alias to an already registered team
+
+        With raw_name=True the alias is a spelling that rows in the database
+        are stored under: it is used for lookups but not handed out by
+        aliases(). Otherwise it is treated like an API-supplied alias.
+        """
+        key = normalize_team_name(alias)
+        if not key or team_id not in self._canonical:
+            return
+        with self._lock:
+            self._aliases[key] = team_id
+            if raw_name:
+                self._names[team_id].add(alias)
+            else:
+                self._team_aliases[key] = team_id
+
+    def add_teams(self, teams: List[Dict]):
+        """Register teams as returned by DataFetcher.fetch_teams / Database.get_teams"""
+        for team in teams:
+            self.add_team(team.get("id"), team.get("name"),
+                          (team.get("short_name"), team.get("tla")))
+
+    def resolve(self, name: str) -> Optional[int]:
+        """Resolve any spelling of a team name to its canonical team id"""
+        key = normalize_team_name(name)
+        if not key:
+            return None
+        team_id = self._aliases.get(key)
+        if team_id is not None:
+            return team_id
+
+        # Unknown spelling: accept it as whole words of a known name
+        # ("Wolverhampton", "Nottingham"), but only if that points at a single
+        # team ("Manchester", "United" and "City" do not). Not remembered:
+        # request input must not grow the index. TLAs are skipped ("che" is
+        # not Chelsea here).
+        padded_key = f" {key} "
+        candidates = {
+            candidate for alias, candidate in list(self._aliases.items())
+            if len(alias) >= 4 and padded_key in f" {alias} "
+        }
+        return candidates.pop() if len(candidates) == 1 else None
+
+    def canonical_name(self, name: str) -> Optional[str]:
+        """Return the canonical name for any spelling of a team name"""
+        team_id = self.resolve(name)
+        return self._canonical.get(team_id) if team_id is not None else None
+
+    def name_for_id(self, team_id: int) -> Optional[str]:
+        return self._canonical.get(team_id)
+
+    def stored_names(self, team_id: int) -> List[str]:
+        """All raw spellings rows for this team may be stored under"""
+        return sorted(self._names.get(team_id, ()))
+
+    def team_key(self, name: str):
+        """Identity of a club across sources: its team id, else its normalized full name
+
+        Archive spellings are expanded first, so "Wolves" in a CSV file and
+        "Wolverhampton Wanderers FC" from the API give the same key even for
+        clubs the index does not know.
+        """
+        full_name = archive_team_name(name)
+        team_id = self.resolve(full_name)
+        return team_id if team_id is not None else normalize_team_name(full_name)
+
+    def fingerprint(self) -> str:
+        """Hash of the alias index; changes whenever a spelling maps to a different team"""
+        with self._lock:
+            aliases = sorted(self._aliases.items())
+        return hashlib.sha256(json.dumps(aliases).encode()).hexdigest()
+
+    def aliases(self) -> Dict[str, int]:
+        """API-supplied aliases (for persisting the index)"""
+        return dict(self._team_aliases)
@@ -0,0 +1,113 @@
+import os
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Dict
+
+from database.db import Database
+
+# Worker threads for SQLite calls; each keeps its own persistent connection
+DB_EXECUTOR_WORKERS = int(os.getenv("DB_EXECUTOR_WORKERS", "4"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_db_executor() -> ThreadPoolExecutor:
+    """Return the shared database thread pool, creating it on first use"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=DB_EXECUTOR_WORKERS,
+                thread_name_prefix="db"
+            )
+    return _executor
+
+
+def shutdown_db_executor():
+    """Wait for pending database calls and stop the worker threads"""
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=True)
+            _executor = None
+
+
+class AsyncDatabase:
+    """Awaitable facade over Database for use inside async handlers
+
+    Every call runs the synchronous Database method on a shared thread pool,
+    so SQLite I/O never blocks the event loop. The synchronous API stays
+    available through `sync` (and directly on Database) for scripts.
+    """
+
+    def __init__(self, db: Optional[Database] = None):
+        self.sync = db or Database()
+
+    @property
+    def resolver(self):
+        return self.sync.resolver
+
+    def stats_version(self) -> int:
+        # In-memory counter; no I/O, so no executor hop
+        return self.sync.stats_version()
+
+    def team_stats_version(self, team_name: str) -> int:
+        return self.sync.team_stats_version(team_name)
+
+    def team_stats_count(self) -> int:
+        return self.sync.team_stats_count()
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            get_db_executor(), functools.partial(fn, *args, **kwargs)
+        )
+
+    async def init_db(self):
+        return await self._run(self.sync.init_db)
+
+    async def save_teams(self, teams: List[Dict]):
+        return await self._run(self.sync.save_teams, teams)
+
+    async def get_teams(self) -> List[Dict]:
+        return await self._run(self.sync.get_teams)
+
+    async def save_team_stats(self, team_name: str, stats: Dict):
+        return await self._run(self.sync.save_team_stats, team_name, stats)
+
+    async def save_team_stats_bulk(self, stats_list: List[Dict], team_names: Optional[List[str]] = None):
+        return await self._run(self.sync.save_team_stats_bulk, stats_list, team_names)
+
+    async def get_team_stats(self, team_name: str) -> Optional[Dict]:
+        # Served from the in-memory stats table; no executor hop needed
+        return self.sync.get_team_stats(team_name)
+
+    async def reload_stats_table(self) -> List:
+        return await self._run(self.sync.reload_stats_table)
+
+    def get_stats_rows(self, team_names: List[str]):
+        return self.sync.get_stats_rows(team_names)
+
+    async def save_match(self, match: Dict):
+        return await self._run(self.sync.save_match, match)
+
+    async def save_matches(self, matches: List[Dict]):
+        return await self._run(self.sync.save_matches, matches)
+
+    async def replace_scheduled_matches(self, matches: List[Dict]):
+        return await self._run(self.sync.replace_scheduled_matches, matches)
+
+    async def get_scheduled_matches(self, since: Optional[str] = None) -> List[Dict]:
+        return await self._run(self.sync.get_scheduled_matches, since)
+
+    async def get_matches(self, limit: int = 100) -> List[Dict]:
+        return await self._run(self.sync.get_matches, limit)
+
+    async def save_team_players(self, team_name: str, players: List[Dict]):
+        return await self._run(self.sync.save_team_players, team_name, players)
+
+    async def get_team_players(self, team_name: str) -> List[Dict]:
+        return await self._run(self.sync.get_team_players, team_name)
@@ -1,24 +1,111 @@
 import sqlite3
 import os
+import threading
 from typing import List, Optional, Dict
 import json
 from datetime import datetime
 
+from data.team_resolver import TeamResolver, normalize_team_name
+from database.stats_table import TeamStatsTable
+
+# Per-database-file state shared by every Database instance
+_resolvers: Dict[str, "TeamResolver"] = {}
+_stats_versions: Dict[str, "StatsVersions"] = {}
+_stats_tables: Dict[str, TeamStatsTable] = {}
+_shared_lock = threading.Lock()
+
+# Persistent connections, one per (thread, database file)
+_local = threading.local()
+
+# Connection tuning; override via environment variables
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "20000"))
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_STATEMENT_CACHE = int(os.getenv("SQLITE_STATEMENT_CACHE", "256"))
+
+class StatsVersions:
+    """Change counters for team_stats: one global, one per stats-table key
+    
+    Teams are keyed like the in-memory stats table (canonical id, or the
+    normalized name if unknown). Counters only move when a write actually
+    changes a team's row, so caches keyed on them survive repeated saves of
+    identical standings.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.version = 0
+        self._team_versions: Dict[object, int] = {}
+        self._rows: Dict[object, tuple] = {}
+    
+    def record(self, keyed_rows: List[tuple]) -> List:
+        """Record written (key, team_stats row) pairs; return the keys whose stats changed"""
+        changed = []
+        with self._lock:
+            for key, row in keyed_rows:
+                # Row layout: (team_name, ...stats..., updated_at)
+                values = row[1:-1]
+                if self._rows.get(key) != values:
+                    self._rows[key] = values
+                    self._team_versions[key] = self._team_versions.get(key, 0) + 1
+                    changed.append(key)
+            if changed:
+                self.version += 1
+        return changed
+    
+    def team_version(self, key) -> int:
+        return self._team_versions.get(key, 0)
+
+
 class Database:
     """SQLite database for storing teams, matches, and statistics"""
     
     def __init__(self, db_path: str = None):
-        # Use absolute path in backend directory
+        # Use DATABASE_PATH, else an absolute path in the backend directory
         if db_path is None:
             backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            self.db_path = os.path.join(backend_dir, "premier_league.db")
+            self.db_path = os.getenv("DATABASE_PATH") or os.path.join(backend_dir, "premier_league.db")
         else:
             self.db_path = db_path
         self.init_db()
+        self.resolver = self._get_resolver()
+        self.stats_versions = self._get_stats_versions()
+        self.stats_table = self._get_stats_table()
     
     def get_connection(self):
-        """Get database connection"""
-        return sqlite3.connect(self.db_path)
+        """Get this thread's persistent database connection
+        
+        Connections are opened once per thread and database file, in WAL mode
+        so readers never wait on writers, and keep sqlite3's prepared
+        statement cache warm across calls. Callers close their cursor, not
+        the connection.
+        """
+        connections = getattr(_local, "connections", None)
+        if connections is None:
+            connections = _local.connections = {}
+        
+        conn = connections.get(self.db_path)
+        if conn is None:
+            conn = sqlite3.connect(
+                self.db_path,
+                timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+                cached_statements=SQLITE_STATEMENT_CACHE
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+            conn.execute("PRAGMA temp_store=MEMORY")
+            connections[self.db_path] = conn
+        elif conn.in_transaction:
+            # A previous call failed before committing; discard its changes
+            conn.rollback()
+        return conn
+    
+    def close(self):
+        """Close this thread's connection to the database"""
+        connections = getattr(_local, "connections", {})
+        conn = connections.pop(self.db_path, None)
+        if conn is not None:
+            conn.close()
     
     def init_db(self):
         """Initialize database tables"""
@@ -72,8 +159,161 @@ class Database:
             )
         """)
         
+        # Team players table
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS team_players (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                team_name TEXT NOT NULL,
+                player_id INTEGER,
+                player_name TEXT NOT NULL,
+                position TEXT,
+                date_of_birth TEXT,
+                nationality TEXT,
+                role TEXT,
+                shirt_number INTEGER,
+                photo TEXT,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Team aliases table (normalized name / short name / TLA -> team id)
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS team_aliases (
+                alias TEXT PRIMARY KEY,
+                team_id INTEGER NOT NULL
+            )
+        """)
+        
         conn.commit()
-        conn.close()
+        cursor.close()
+    
+    def _get_resolver(self) -> TeamResolver:
+        """Return the shared team-name resolver for this database, building it once"""
+        with _shared_lock:
+            resolver = _resolvers.get(self.db_path)
+            if resolver is None:
+                resolver = TeamResolver()
+                self._load_resolver(resolver)
+                _resolvers[self.db_path] = resolver
+        return resolver
+    
+    def _get_stats_versions(self) -> StatsVersions:
+        """Return the shared team_stats change counters for this database"""
+        with _shared_lock:
+            versions = _stats_versions.get(self.db_path)
+            if versions is None:
+                versions = _stats_versions[self.db_path] = StatsVersions()
+        return versions
+    
+    def _get_stats_table(self) -> TeamStatsTable:
+        """Return the shared in-memory stats table, loading it from SQLite once"""
+        with _shared_lock:
+            table = _stats_tables.get(self.db_path)
+            if table is None:
+                table = TeamStatsTable()
+                self.stats_versions.record(self._load_stats_table(table))
+                _stats_tables[self.db_path] = table
+        return table
+    
+    def _load_stats_table(self, table: TeamStatsTable) -> List[tuple]:
+        """Fill the in-memory stats table from the team_stats table; return the (key, row) pairs loaded"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        # Oldest first, so the latest row wins when spellings share a team
+        cursor.execute("""
+            SELECT team_name, matches_played, wins, draws, losses, goals_for, 
+                   goals_against, goal_diff, points, position, form, updated_at
+            FROM team_stats
+            ORDER BY updated_at
+        """)
+        rows = cursor.fetchall()
+        cursor.close()
+        
+        keyed_rows = {}
+        for row in rows:
+            keyed_rows[self._stats_key(row[0])] = row
+        table.load([(key, self._stats_from_row(row)) for key, row in keyed_rows.items()])
+        return list(keyed_rows.items())
+    
+    def reload_stats_table(self) -> List:
+        """Re-read team_stats after another process wrote it (e.g. a training run)
+        
+        Returns the keys whose stats changed; their versions are bumped so
+        cached predictions built on the old values are not served.
+        """
+        return self.stats_versions.record(self._load_stats_table(self.stats_table))
+    
+    def _stats_key(self, team_name: str):
+        """In-memory stats key: canonical team id, or the normalized name if unknown"""
+        team_id = self.resolver.resolve(team_name)
+        return team_id if team_id is not None else normalize_team_name(team_name)
+    
+    def _stats_keys(self, team_name: str) -> tuple:
+        """Keys to try, in order, when looking a team up in the stats table"""
+        team_id = self.resolver.resolve(team_name)
+        normalized = normalize_team_name(team_name)
+        return (team_id, normalized) if team_id is not None else (normalized,)
+    
+    def _stats_from_row(self, row: tuple) -> Dict:
+        """Stats dict from a (team_name, matches_played, ..., form[, updated_at]) row"""
+        return {
+            'team': row[0],
+            'matches_played': row[1],
+            'wins': row[2],
+            'draws': row[3],
+            'losses': row[4],
+            'goals_for': row[5],
+            'goals_against': row[6],
+            'goal_diff': row[7],
+            'points': row[8],
+            'position': row[9],
+            'form': row[10]
+        }
+    
+    def stats_version(self) -> int:
+        """Counter bumped whenever any team's stats change"""
+        return self.stats_versions.version
+    
+    def team_stats_version(self, team_name: str) -> int:
+        """Counter bumped whenever this team's stats change
+        
+        Summed over the same keys get_team_stats tries, so it moves with
+        whichever row a read would return.
+        """
+        return sum(self.stats_versions.team_version(key) for key in self._stats_keys(team_name))
+    
+    def _load_resolver(self, resolver: TeamResolver):
+        """Populate a resolver from the teams and team_aliases tables"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("SELECT id, name, short_name FROM teams")
+        for team_id, name, short_name in cursor.fetchall():
+            resolver.add_team(team_id, name, (short_name,))
+        
+        cursor.execute("SELECT alias, team_id FROM team_aliases")
+        for alias, team_id in cursor.fetchall():
+            resolver.add_alias(alias, team_id)
+        
+        # Remember legacy spellings that rows were stored under
+        cursor.execute("""
+            SELECT team_name FROM team_stats
+            UNION SELECT team_name FROM team_players
+        """)
+        for (stored_name,) in cursor.fetchall():
+            team_id = resolver.resolve(stored_name)
+            if team_id is not None:
+                resolver.add_alias(stored_name, team_id, raw_name=True)
+        
+        cursor.close()
+    
+    def _stored_names(self, team_name: str) -> List[str]:
+        """Names that rows for this team may be stored under"""
+        team_id = self.resolver.resolve(team_name)
+        if team_id is None:
+            return [team_name]
+        return self.resolver.stored_names(team_id)
     
     def save_teams(self, teams: List[Dict]):
         """Save teams to database"""
@@ -92,9 +332,18 @@ class Database:
                 team.get('founded'),
                 datetime.now()
             ))
+            
+            self.resolver.add_team(team.get('id'), team.get('name'),
+                                   (team.get('short_name'), team.get('tla')))
+        
+        # Persist the alias index so it is rebuilt without the API next time
+        cursor.executemany(
+            "INSERT OR REPLACE INTO team_aliases (alias, team_id) VALUES (?, ?)",
+            list(self.resolver.aliases().items())
+        )
         
         conn.commit()
-        conn.close()
+        cursor.close()
     
     def get_teams(self) -> List[Dict]:
         """Get all teams from database"""
@@ -114,21 +363,14 @@ class Database:
                 'founded': row[4]
             })
         
-        conn.close()
+        cursor.close()
         return teams
     
-    def save_team_stats(self, team_name: str, stats: Dict):
-        """Save team statistics"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            INSERT OR REPLACE INTO team_stats 
-            (team_name, matches_played, wins, draws, losses, goals_for, 
-             goals_against, goal_diff, points, position, form, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            stats.get('team', team_name),
+    def _team_stats_row(self, team_name: str, stats: Dict) -> tuple:
+        """Build a team_stats row from a stats dict"""
+        name = stats.get('team', team_name)
+        return (
+            self.resolver.canonical_name(name) or name,
             stats.get('matches_played', 0),
             stats.get('wins', 0),
             stats.get('draws', 0),
@@ -140,82 +382,49 @@ class Database:
             stats.get('position', 0),
             stats.get('form', ''),
             datetime.now()
-        ))
-        
-        conn.commit()
-        conn.close()
+        )
     
-    def get_team_stats(self, team_name: str) -> Optional[Dict]:
-        """Get team statistics with fuzzy name matching"""
+    def save_team_stats(self, team_name: str, stats: Dict):
+        """Save team statistics"""
+        self.save_team_stats_bulk([stats], [team_name])
+    
+    def save_team_stats_bulk(self, stats_list: List[Dict], team_names: Optional[List[str]] = None):
+        """Upsert statistics for many teams in a single transaction"""
+        if team_names is None:
+            team_names = [stats.get('team') for stats in stats_list]
+        rows = [self._team_stats_row(name, stats) for name, stats in zip(team_names, stats_list)]
+        if not rows:
+            return
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Try multiple name variations
-        name_variations = [
-            team_name,  # Exact match
-            team_name + " FC",  # Add FC
-            team_name.replace(" FC", ""),  # Remove FC if present
-            team_name.replace("United", "Utd"),  # United -> Utd
-            team_name.replace("Utd", "United"),  # Utd -> United
-        ]
+        cursor.executemany("""
+            INSERT OR REPLACE INTO team_stats 
+            (team_name, matches_played, wins, draws, losses, goals_for, 
+             goals_against, goal_diff, points, position, form, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, rows)
         
-        # Also try case-insensitive matches
-        for name_var in name_variations:
-            cursor.execute("""
-                SELECT matches_played, wins, draws, losses, goals_for, 
-                       goals_against, goal_diff, points, position, form
-                FROM team_stats
-                WHERE LOWER(team_name) = LOWER(?)
-            """, (name_var,))
-            
-            row = cursor.fetchone()
-            if row:
-                conn.close()
-                return {
-                    'matches_played': row[0],
-                    'wins': row[1],
-                    'draws': row[2],
-                    'losses': row[3],
-                    'goals_for': row[4],
-                    'goals_against': row[5],
-                    'goal_diff': row[6],
-                    'points': row[7],
-                    'position': row[8],
-                    'form': row[9]
-                }
-        
-        # If no exact match, try to find by partial match
-        cursor.execute("""
-            SELECT matches_played, wins, draws, losses, goals_for, 
-                   goals_against, goal_diff, points, position, form
-            FROM team_stats
-            WHERE LOWER(team_name) LIKE LOWER(?)
-               OR LOWER(team_name) LIKE LOWER(?)
-        """, (f"%{team_name}%", f"%{team_name.replace(' FC', '')}%"))
-        
-        row = cursor.fetchone()
-        conn.close()
-        
-        if row:
-            return {
-                'matches_played': row[0],
-                'wins': row[1],
-                'draws': row[2],
-                'losses': row[3],
-                'goals_for': row[4],
-                'goals_against': row[5],
-                'goal_diff': row[6],
-                'points': row[7],
-                'position': row[8],
-                'form': row[9]
-            }
-        return None
+        conn.commit()
+        cursor.close()
+        keyed_rows = [(self._stats_key(row[0]), row) for row in rows]
+        self.stats_table.upsert([(key, self._stats_from_row(row)) for key, row in keyed_rows])
+        self.stats_versions.record(keyed_rows)
     
-    def save_match(self, match: Dict):
-        """Save match to database"""
-        conn = self.get_connection()
-        cursor = conn.cursor()
-        
+    def team_stats_count(self) -> int:
+        """Teams with stats in the in-memory table"""
+        return len(self.stats_table)
+    
+    def get_team_stats(self, team_name: str) -> Optional[Dict]:
+        """Get team statistics from the in-memory table (no SQLite access)"""
+        return self.stats_table.get(self._stats_keys(team_name))
+    
+    def get_stats_rows(self, team_names: List[str]):
+        """Stats snapshot and its array row per team (-1 if unknown), for vectorized reads"""
+        return self.stats_table.rows([self._stats_keys(name) for name in team_names])
+    
+    def _match_row(self, match: Dict) -> tuple:
         # Determine result
         home_score = match.get('home_score')
         away_score = match.get('away_score')
@@ -228,11 +437,7 @@ class Database:
             else:
                 result = "DRAW"
         
-        cursor.execute("""
-            INSERT OR REPLACE INTO matches 
-            (id, home_team, away_team, match_date, home_score, away_score, status, result, updated_at)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
+        return (
             match.get('id'),
             match.get('home_team'),
             match.get('away_team'),
@@ -242,10 +447,123 @@ class Database:
             match.get('status'),
             result,
             datetime.now()
-        ))
+        )
+    
+    def save_match(self, match: Dict):
+        """Save match to database"""
+        self.save_matches([match])
+    
+    def save_matches(self, matches: List[Dict]):
+        """Save many matches in one transaction"""
+        if not matches:
+            return
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.executemany("""
+            INSERT OR REPLACE INTO matches 
+            (id, home_team, away_team, match_date, home_score, away_score, status, result, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [self._match_row(match) for match in matches])
         
         conn.commit()
-        conn.close()
+        cursor.close()
+    
+    def import_matches(self, matches: List[Dict]) -> int:
+        """Insert matches whose id is not stored yet, in one transaction
+        
+        Returns the number of rows inserted; existing ids are left untouched.
+        """
+        if not matches:
+            return 0
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        before = conn.total_changes
+        
+        cursor.executemany("""
+            INSERT OR IGNORE INTO matches 
+            (id, home_team, away_team, match_date, home_score, away_score, status, result, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [self._match_row(match) for match in matches])
+        
+        conn.commit()
+        inserted = conn.total_changes - before
+        cursor.close()
+        return inserted
+    
+    def get_finished_matches(self) -> List[Dict]:
+        """All matches with a final score, oldest first (training history)"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, home_team, away_team, match_date, home_score, away_score
+            FROM matches
+            WHERE home_score IS NOT NULL AND away_score IS NOT NULL
+            ORDER BY match_date
+        """)
+        
+        matches = [
+            {
+                'id': row[0],
+                'home_team': row[1],
+                'away_team': row[2],
+                'date': row[3],
+                'home_score': row[4],
+                'away_score': row[5]
+            }
+            for row in cursor
+        ]
+        
+        cursor.close()
+        return matches
+    
+    def replace_scheduled_matches(self, matches: List[Dict]):
+        """Swap the stored fixture list for a fresh one, in one transaction
+        
+        Fixtures that were postponed or dropped from the schedule disappear;
+        finished matches are untouched.
+        """
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("DELETE FROM matches WHERE status = 'SCHEDULED'")
+        cursor.executemany("""
+            INSERT OR REPLACE INTO matches 
+            (id, home_team, away_team, match_date, home_score, away_score, status, result, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [self._match_row(dict(match, status='SCHEDULED')) for match in matches])
+        
+        conn.commit()
+        cursor.close()
+    
+    def get_scheduled_matches(self, since: Optional[str] = None) -> List[Dict]:
+        """Scheduled fixtures kicking off at or after `since` (ISO UTC), soonest first"""
+        conn = self.get_connection()
+        cursor = conn.cursor()
+        
+        cursor.execute("""
+            SELECT id, home_team, away_team, match_date, home_score, away_score, status
+            FROM matches
+            WHERE status = 'SCHEDULED' AND match_date >= ?
+            ORDER BY match_date, id
+        """, (since or "",))
+        
+        matches = [
+            {
+                'id': row[0],
+                'home_team': row[1],
+                'away_team': row[2],
+                'date': row[3],
+                'status': row[6],
+                'home_score': row[4],
+                'away_score': row[5]
+            }
+            for row in cursor
+        ]
+        
+        cursor.close()
+        return matches
     
     def get_matches(self, limit: int = 100) -> List[Dict]:
         """Get matches from database"""
@@ -273,68 +591,55 @@ class Database:
                 'result': row[7]
             })
         
-        conn.close()
+        cursor.close()
         return matches
     
     def save_team_players(self, team_name: str, players: List[Dict]):
         """Save team players to database"""
+        stale_names = self._stored_names(team_name)
+        team_name = self.resolver.canonical_name(team_name) or team_name
+        
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Create players table if it doesn't exist
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS team_players (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                team_name TEXT NOT NULL,
-                player_id INTEGER,
-                player_name TEXT NOT NULL,
-                position TEXT,
-                date_of_birth TEXT,
-                nationality TEXT,
-                role TEXT,
-                shirt_number INTEGER,
-                photo TEXT,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        """)
-        
-        # Delete old players for this team
-        cursor.execute("DELETE FROM team_players WHERE team_name = ?", (team_name,))
+        # Delete old players for this team (under any stored spelling)
+        placeholders = ", ".join("?" for _ in stale_names)
+        cursor.execute(f"DELETE FROM team_players WHERE team_name IN ({placeholders})", stale_names)
         
         # Insert new players
-        for player in players:
-            cursor.execute("""
-                INSERT INTO team_players 
-                (team_name, player_id, player_name, position, date_of_birth, 
-                 nationality, role, shirt_number, photo, updated_at)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                team_name,
-                player.get('id'),
-                player.get('name'),
-                player.get('position'),
-                player.get('dateOfBirth'),
-                player.get('nationality'),
-                player.get('role'),
-                player.get('shirtNumber'),
-                player.get('photo'),
-                datetime.now()
-            ))
+        cursor.executemany("""
+            INSERT INTO team_players 
+            (team_name, player_id, player_name, position, date_of_birth, 
+             nationality, role, shirt_number, photo, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        """, [(
+            team_name,
+            player.get('id'),
+            player.get('name'),
+            player.get('position'),
+            player.get('dateOfBirth'),
+            player.get('nationality'),
+            player.get('role'),
+            player.get('shirtNumber'),
+            player.get('photo'),
+            datetime.now()
+        ) for player in players])
         
         conn.commit()
-        conn.close()
+        cursor.close()
     
     def get_team_players(self, team_name: str) -> List[Dict]:
         """Get team players from database"""
+        names = self._stored_names(team_name)
         conn = self.get_connection()
         cursor = conn.cursor()
         
-        # Try exact match first
-        cursor.execute("""
+        placeholders = ", ".join("?" for _ in names)
+        cursor.execute(f"""
             SELECT player_id, player_name, position, date_of_birth, 
                    nationality, role, shirt_number, photo
             FROM team_players 
-            WHERE team_name = ?
+            WHERE team_name IN ({placeholders})
             ORDER BY 
                 CASE position
                     WHEN 'Goalkeeper' THEN 1
@@ -348,69 +653,21 @@ class Database:
                     ELSE 5
                 END,
                 shirt_number
-        """, (team_name,))
+        """, names)
         
         rows = cursor.fetchall()
-        if rows:
-            players = []
-            for row in rows:
-                players.append({
-                    'id': row[0],
-                    'name': row[1],
-                    'position': row[2],
-                    'dateOfBirth': row[3],
-                    'nationality': row[4],
-                    'role': row[5],
-                    'shirtNumber': row[6],
-                    'photo': row[7]
-                })
-            conn.close()
-            return players
-        
-        # Try fuzzy matching
-        normalized_input = team_name.lower().replace(" fc", "").strip()
-        cursor.execute("SELECT DISTINCT team_name FROM team_players")
-        all_teams = cursor.fetchall()
-        
-        for (db_team_name,) in all_teams:
-            normalized_db = db_team_name.lower().replace(" fc", "").strip()
-            if normalized_input == normalized_db or normalized_input in normalized_db or normalized_db in normalized_input:
-                cursor.execute("""
-                    SELECT player_id, player_name, position, date_of_birth, 
-                           nationality, role, shirt_number, photo
-                    FROM team_players 
-                    WHERE team_name = ?
-                    ORDER BY 
-                        CASE position
-                            WHEN 'Goalkeeper' THEN 1
-                            WHEN 'Defence' THEN 2
-                            WHEN 'Defender' THEN 2
-                            WHEN 'Midfield' THEN 3
-                            WHEN 'Midfielder' THEN 3
-                            WHEN 'Offence' THEN 4
-                            WHEN 'Attacker' THEN 4
-                            WHEN 'Forward' THEN 4
-                            ELSE 5
-                        END,
-                        shirt_number
-                """, (db_team_name,))
-                rows = cursor.fetchall()
-                if rows:
-                    players = []
-                    for row in rows:
-                        players.append({
-                            'id': row[0],
-                            'name': row[1],
-                            'position': row[2],
-                            'dateOfBirth': row[3],
-                            'nationality': row[4],
-                            'role': row[5],
-                            'shirtNumber': row[6],
-                            'photo': row[7]
-                        })
-                    conn.close()
-                    return players
-        
-        conn.close()
-        return []
-
+        cursor.close()
+        
+        players = []
+        for row in rows:
+            players.append({
+                'id': row[0],
+                'name': row[1],
+                'position': row[2],
+                'dateOfBirth': row[3],
+                'nationality': row[4],
+                'role': row[5],
+                'shirtNumber': row[6],
+                'photo': row[7]
+            })
+        return players
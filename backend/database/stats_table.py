@@ -0,0 +1,73 @@
+import threading
+import numpy as np
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+from data.stats_array import stats_to_array
+
+
+class StatsSnapshot:
+    """Immutable view of every team's stats: dicts plus a float32 array"""
+
+    __slots__ = ("keys", "index", "stats", "array")
+
+    def __init__(self, stats: Dict[Hashable, Dict]):
+        self.keys: List[Hashable] = list(stats)
+        self.index: Dict[Hashable, int] = {key: i for i, key in enumerate(self.keys)}
+        self.stats = stats
+        # Row i holds the STAT_COLUMNS of keys[i]
+        self.array = stats_to_array([stats[key] for key in self.keys])
+        self.array.setflags(write=False)
+
+
+class TeamStatsTable:
+    """Process-local team stats, keyed by canonical team id
+
+    Readers take the current snapshot without locking; writers build a new
+    snapshot and swap the reference, so a reader never sees a half-applied
+    update.
+    """
+
+    def __init__(self):
+        self._write_lock = threading.Lock()
+        self._snapshot = StatsSnapshot({})
+
+    def __len__(self) -> int:
+        return len(self._snapshot.keys)
+
+    @property
+    def snapshot(self) -> StatsSnapshot:
+        return self._snapshot
+
+    def load(self, items: Sequence[Tuple[Hashable, Dict]]):
+        """Replace the whole table"""
+        with self._write_lock:
+            self._snapshot = StatsSnapshot(dict(items))
+
+    def upsert(self, items: Sequence[Tuple[Hashable, Dict]]):
+        """Insert or replace some teams' stats atomically"""
+        if not items:
+            return
+        with self._write_lock:
+            stats = dict(self._snapshot.stats)
+            stats.update(items)
+            self._snapshot = StatsSnapshot(stats)
+
+    def get(self, keys: Sequence[Hashable]) -> Optional[Dict]:
+        """Stats for the first key present, as a copy"""
+        stats = self._snapshot.stats
+        for key in keys:
+            if key in stats:
+                return dict(stats[key])
+        return None
+
+    def rows(self, keys_per_team: Sequence[Sequence[Hashable]]) -> Tuple[StatsSnapshot, np.ndarray]:
+        """Array row for each team (-1 when unknown), from one consistent snapshot"""
+        snapshot = self._snapshot
+        rows = np.full(len(keys_per_team), -1, dtype=np.intp)
+        for i, keys in enumerate(keys_per_team):
+            for key in keys:
+                row = snapshot.index.get(key)
+                if row is not None:
+                    rows[i] = row
+                    break
+        return snapshot, rows
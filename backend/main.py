@@ -1,20 +1,26 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Header, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 from typing import Optional, List
 import uvicorn
 import os
+import hmac
 import asyncio
-from datetime import datetime
+from datetime import datetime, timezone
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-from models.predictor import MatchPredictor, SeasonPredictor
+from models.predictor import MatchPredictor, SeasonPredictor, MODEL_WATCH_INTERVAL
 from data.data_fetcher import DataFetcher
-from database.db import Database
-from schemas import MatchPrediction, SeasonPrediction, Team, Match, Player
+from data.response_cache import stale_responses
+from data.refresh_scheduler import RefreshScheduler, upcoming_fixtures
+from database.async_db import AsyncDatabase, shutdown_db_executor
+from schemas import (
+    MatchPrediction, BatchMatchPredictionRequest, UpcomingPredictions,
+    SeasonPrediction, Team, Match, Player
+)
 
 
 def get_mock_teams():
@@ -87,20 +93,77 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Data-Stale", "X-Data-Fetched-At"],
 )
 
 # Initialize components
-db = Database()
-data_fetcher = DataFetcher()
-match_predictor = MatchPredictor()
-season_predictor = SeasonPredictor()
+db = AsyncDatabase()
+data_fetcher = DataFetcher(resolver=db.resolver)
+match_predictor = MatchPredictor(data_fetcher)
+season_predictor = SeasonPredictor(data_fetcher, match_predictor)
+# Keeps teams, standings, fixtures and squads in the database current
+refresh_scheduler = RefreshScheduler(db)
+# Background task that hot-swaps newly trained models
+model_watcher: Optional[asyncio.Task] = None
+# /api/admin/* requires a matching X-Admin-Token header; disabled when unset
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# Upstream endpoints the served data comes from, for flagging stale responses
+TEAMS_ENDPOINT = f"competitions/{data_fetcher.competition_id}/teams"
+STANDINGS_ENDPOINT = f"competitions/{data_fetcher.competition_id}/standings"
+FIXTURES_ENDPOINT = f"competitions/{data_fetcher.competition_id}/matches?status=SCHEDULED"
+# Seconds clients are asked to wait while the first background refresh runs
+REFRESH_RETRY_AFTER = os.getenv("REFRESH_RETRY_AFTER", "10")
+
+
+def refresh_pending() -> bool:
+    """True until the first background refresh has stored teams, stats and fixtures"""
+    return refresh_scheduler.enabled and not refresh_scheduler.ready
+
+
+def data_loading() -> HTTPException:
+    """503 for data the background refresh has not stored yet (handlers never call upstream)"""
+    return HTTPException(
+        status_code=503,
+        detail="Data is still loading. Please try again in a moment.",
+        headers={"Retry-After": REFRESH_RETRY_AFTER}
+    )
+
+
+def mark_stale(response: Response, *endpoints: str):
+    """Flag a response whose data comes from a cached body served in place of the API"""
+    fetched_at = stale_responses.oldest(endpoints)
+    if fetched_at is not None:
+        response.headers["X-Data-Stale"] = "true"
+        response.headers["X-Data-Fetched-At"] = datetime.fromtimestamp(fetched_at, timezone.utc).isoformat()
+
+
+async def swap_models(version: Optional[str] = None) -> bool:
+    """Swap a model version (default: latest) into both predictors together"""
+    if not await match_predictor.reload_model(version):
+        return False
+    await season_predictor.reload_model()
+    # The training run that published the model also wrote team_stats
+    changed = await db.reload_stats_table()
+    if changed:
+        print(f"Reloaded stats for {len(changed)} teams written by another process")
+    return True
+
+
+async def require_team_stats(*team_names: str):
+    """Raise 503 while stats for any of these teams are still being loaded"""
+    if refresh_pending():
+        stats = await asyncio.gather(*[db.get_team_stats(name) for name in team_names])
+        if not all(stats):
+            raise data_loading()
 
 @app.on_event("startup")
 async def startup_event():
     """Initialize models and database on startup"""
+    # Open the shared upstream HTTP session (pooled connections, keep-alive)
+    await data_fetcher.start()
     try:
         # Ensure database is initialized
-        db.init_db()
+        await db.init_db()
         # Load trained models
         match_predictor.load_model()
         season_predictor.load_model()
@@ -108,6 +171,24 @@ async def startup_event():
     except Exception as e:
         print(f"Warning: Could not load models: {e}")
         print("Run training script first: python scripts/train_models.py")
+    
+    # Refresh upstream data in the background; handlers read the database
+    await refresh_scheduler.start()
+    
+    # Pick up newly trained models without a restart
+    global model_watcher
+    if MODEL_WATCH_INTERVAL > 0:
+        model_watcher = asyncio.create_task(match_predictor.watch_models(reload=swap_models))
+
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Release shared resources on shutdown"""
+    if model_watcher is not None:
+        model_watcher.cancel()
+    await refresh_scheduler.stop()
+    await data_fetcher.close()
+    shutdown_db_executor()
 
 
 @app.get("/")
@@ -117,19 +198,28 @@ async def root():
         "version": "1.0.0",
         "endpoints": {
             "predict_match": "/api/predict/match/{home_team}/{away_team}",
+            "predict_matches": "/api/predict/matches",
+            "predict_upcoming": "/api/predict/upcoming",
             "predict_season": "/api/predict/season",
             "teams": "/api/teams",
             "matches": "/api/matches",
-            "team_stats": "/api/stats/{team}"
+            "team_stats": "/api/stats/{team}",
+            "reload_models": "/api/admin/models/reload"
         }
     }
 
 
 @app.get("/api/teams", response_model=List[Team])
-async def get_teams():
+async def get_teams(response: Response):
     """Get all Premier League teams"""
     try:
-        teams = db.get_teams()
+        teams = await db.get_teams()
+        if not teams and refresh_pending():
+            raise data_loading()
+        if not teams and refresh_scheduler.enabled:
+            # The background refresh could not load teams from the API
+            print("No teams stored, using mock teams data")
+            return get_mock_teams()
         if not teams:
             # Fetch from API if not in database
             teams_data = await data_fetcher.fetch_teams()
@@ -137,30 +227,40 @@ async def get_teams():
                 # Use mock data if API unavailable
                 print("API unavailable, using mock teams data")
                 teams_data = get_mock_teams()
-            db.save_teams(teams_data)
-            teams = db.get_teams()
+            await db.save_teams(teams_data)
+            teams = await db.get_teams()
         return teams
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, TEAMS_ENDPOINT)
 
 
 @app.get("/api/matches", response_model=List[Match])
-async def get_matches():
+async def get_matches(response: Response):
     """Get upcoming Premier League matches"""
     try:
-        matches = await data_fetcher.fetch_upcoming_matches()
+        matches = await upcoming_fixtures(db, data_fetcher)
+        if not matches and refresh_pending():
+            raise data_loading()
         # If no matches from API, return empty list (frontend handles this gracefully)
         if not matches:
             print("No matches available from API")
             return []  # Return empty list instead of None
         return matches
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching matches: {e}")
         return []  # Return empty list on error instead of raising exception
+    finally:
+        mark_stale(response, FIXTURES_ENDPOINT)
 
 
 @app.get("/api/predict/match/{home_team}/{away_team}", response_model=MatchPrediction)
-async def predict_match(home_team: str, away_team: str):
+async def predict_match(home_team: str, away_team: str, response: Response):
     """
     Predict the outcome of a specific match
     
@@ -171,6 +271,7 @@ async def predict_match(home_team: str, away_team: str):
         # Normalize team names
         home_team = home_team.replace("_", " ").replace("-", " ")
         away_team = away_team.replace("_", " ").replace("-", " ")
+        await require_team_stats(home_team, away_team)
         
         # Add timeout to prevent hanging (20 seconds max)
         prediction = await asyncio.wait_for(
@@ -184,15 +285,87 @@ async def predict_match(home_team: str, away_team: str):
             status_code=504,
             detail="Prediction timed out. Please try again."
         )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in match prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, STANDINGS_ENDPOINT)
+
+
+@app.post("/api/predict/matches", response_model=List[MatchPrediction])
+async def predict_matches(request: BatchMatchPredictionRequest, response: Response):
+    """
+    Predict many fixtures in one request (e.g. a full matchday)
+    
+    - **fixtures**: List of {home_team, away_team} pairs
+    """
+    try:
+        fixtures = [
+            (f.home_team.replace("_", " ").replace("-", " "),
+             f.away_team.replace("_", " ").replace("-", " "))
+            for f in request.fixtures
+        ]
+        await require_team_stats(*{name for fixture in fixtures for name in fixture})
+        
+        # Add timeout to prevent hanging (30 seconds max)
+        predictions = await asyncio.wait_for(
+            match_predictor.predict_many(fixtures),
+            timeout=30.0
+        )
+        return predictions
+    except asyncio.TimeoutError:
+        print("Batch match prediction timed out")
+        raise HTTPException(
+            status_code=504,
+            detail="Prediction timed out. Please try again."
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in batch match prediction: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, STANDINGS_ENDPOINT)
+
+
+@app.get("/api/predict/upcoming", response_model=UpcomingPredictions)
+async def predict_upcoming(response: Response):
+    """Predict every scheduled fixture (served from cache until stats or model change)"""
+    try:
+        if refresh_pending() and not await upcoming_fixtures(db, data_fetcher):
+            raise data_loading()
+        # Add timeout to prevent hanging (30 seconds max)
+        prediction = await asyncio.wait_for(
+            match_predictor.predict_upcoming(),
+            timeout=30.0
+        )
+        return prediction
+    except asyncio.TimeoutError:
+        print("Upcoming predictions timed out")
+        raise HTTPException(
+            status_code=504,
+            detail="Prediction timed out. Please try again."
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in upcoming predictions: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, STANDINGS_ENDPOINT, FIXTURES_ENDPOINT)
 
 
 @app.get("/api/predict/season", response_model=SeasonPrediction)
-async def predict_season():
+async def predict_season(response: Response):
     """Predict the entire season standings"""
     try:
+        if refresh_pending():
+            teams = await db.get_teams()
+            if not teams:
+                raise data_loading()
+            await require_team_stats(*[team["name"] for team in teams])
         # Add timeout to prevent hanging (30 seconds max)
         prediction = await asyncio.wait_for(
             season_predictor.predict_season(),
@@ -205,52 +378,82 @@ async def predict_season():
             status_code=504, 
             detail="Season prediction timed out. Please try again in a moment."
         )
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in season prediction: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, TEAMS_ENDPOINT, STANDINGS_ENDPOINT, FIXTURES_ENDPOINT)
 
 
 @app.get("/api/stats/{team}")
-async def get_team_stats(team: str, refresh: bool = False):
+async def get_team_stats(team: str, response: Response, refresh: bool = False):
     """Get statistics for a specific team
     
     Args:
         team: Team name
-        refresh: If True, force refresh from API (default: False, but will refresh if data is old)
+        refresh: If True, refresh the standings first (default: False; the
+            background refresh keeps stored stats current). Requests share one
+            refresh per REFRESH_ON_DEMAND_MIN_AGE seconds, so they can't spend
+            the upstream quota.
     """
     try:
         team = team.replace("_", " ").replace("-", " ")
         
-        # Always fetch fresh data from API to ensure accuracy
-        # The API provides the most up-to-date standings
+        if refresh:
+            await refresh_scheduler.refresh_if_older("standings")
+        
+        # Stored stats are kept current by the refresh scheduler (or were just
+        # refreshed); without it, fetch standings from the API on demand
+        if refresh_scheduler.enabled or refresh:
+            stats = await db.get_team_stats(team)
+            if stats:
+                return stats
+            if refresh_pending():
+                raise data_loading()
+            if db.team_stats_count():
+                raise HTTPException(status_code=404, detail=f"No stats for team {team}")
+            # The API has been unavailable, so no standings are stored at all
+            print(f"No stored stats, using mock stats for {team}")
+            return get_mock_team_stats(team)
         stats = await data_fetcher.fetch_team_stats(team)
         
         if not stats:
             # Try database as fallback
-            stats = db.get_team_stats(team)
+            stats = await db.get_team_stats(team)
             if not stats:
                 # Use mock data if API unavailable
                 print(f"API unavailable, using mock stats for {team}")
                 stats = get_mock_team_stats(team)
         else:
             # Save fresh data to database
-            db.save_team_stats(team, stats)
+            await db.save_team_stats(team, stats)
         
         return stats
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+    finally:
+        mark_stale(response, STANDINGS_ENDPOINT)
 
 
 @app.get("/api/players/{team}", response_model=List[Player])
-async def get_team_players(team: str):
+async def get_team_players(team: str, response: Response):
     """Get squad/players for a specific team"""
     try:
         team = team.replace("_", " ").replace("-", " ")
         
         # Try database first (cached data)
-        cached_players = db.get_team_players(team)
+        cached_players = await db.get_team_players(team)
         if cached_players:
             return cached_players
+        if refresh_pending():
+            raise data_loading()
+        if refresh_scheduler.enabled:
+            # The background refresh has no squad for this team
+            return []
         
         # If not in cache, try API with timeout
         try:
@@ -260,7 +463,7 @@ async def get_team_players(team: str):
             )
             if players:
                 # Cache the players
-                db.save_team_players(team, players)
+                await db.save_team_players(team, players)
                 return players
         except asyncio.TimeoutError:
             print(f"Timeout fetching players for {team} from API")
@@ -269,9 +472,34 @@ async def get_team_players(team: str):
         
         # Return empty list if API fails (frontend will handle gracefully)
         return []
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_team_players: {e}")
         return []
+    finally:
+        team_id = db.resolver.resolve(team.replace("_", " ").replace("-", " "))
+        if team_id is not None:
+            mark_stale(response, f"teams/{team_id}")
+
+
+@app.post("/api/admin/models/reload")
+async def reload_models(version: Optional[str] = None, x_admin_token: Optional[str] = Header(None)):
+    """Load a model version (default: latest) and swap it in without downtime"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin endpoints are disabled (ADMIN_TOKEN not set)")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token.encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+    
+    if not await swap_models(version):
+        raise HTTPException(
+            status_code=500,
+            detail=f"Could not load model version {version or 'latest'}"
+        )
+    return {
+        "model_version": match_predictor.artifact_version,
+        "reloads": match_predictor.model_version
+    }
 
 
 @app.get("/api/health")
@@ -280,7 +508,11 @@ async def health_check():
     return {
         "status": "healthy",
         "timestamp": datetime.now().isoformat(),
-        "models_loaded": match_predictor.model_loaded
+        "models_loaded": match_predictor.model_loaded,
+        "model_version": match_predictor.artifact_version,
+        "prediction_cache": match_predictor.cache.stats(),
+        "upstream": dict(data_fetcher.limiter.stats(), **stale_responses.stats()),
+        "refresh": refresh_scheduler.stats()
     }
 
 
@@ -0,0 +1,144 @@
+import os
+import time
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import xgboost as xgb
+from sklearn.metrics import log_loss, mean_absolute_error
+from sklearn.model_selection import TimeSeriesSplit
+
+# Worker processes for the search (default: every core)
+TRAIN_WORKERS = int(os.getenv("TRAIN_WORKERS", "0")) or os.cpu_count() or 1
+
+# Boosting rounds are capped here and cut short by early stopping
+MAX_ESTIMATORS = 1000
+EARLY_STOPPING_ROUNDS = 30
+# Tail of each training fold held out for early stopping
+EARLY_STOPPING_FRACTION = 0.15
+
+SEARCH_SPACE = {
+    "max_depth": [3, 4, 5, 6, 8],
+    "learning_rate": [0.02, 0.05, 0.1, 0.2],
+    "min_child_weight": [1, 3, 5, 10],
+    "subsample": [0.7, 0.85, 1.0],
+    "colsample_bytree": [0.7, 0.85, 1.0],
+    "reg_lambda": [1.0, 5.0, 10.0]
+}
+
+# Model kind -> (estimator class, validation metric, metric name)
+MODEL_KINDS = {
+    "outcome": (xgb.XGBClassifier, lambda y, model, X: log_loss(y, model.predict_proba(X), labels=[0, 1, 2]), "log_loss"),
+    "score": (xgb.XGBRegressor, lambda y, model, X: mean_absolute_error(y, model.predict(X)), "mae")
+}
+
+# Training data for each model kind, set once per worker process
+_datasets: Dict[str, Tuple[np.ndarray, np.ndarray]] = {}
+
+
+def sample_params(n_trials: int, seed: int = 42) -> List[Dict]:
+    """Random distinct configurations from SEARCH_SPACE (the whole grid if it is smaller)"""
+    names = list(SEARCH_SPACE)
+    grid_size = int(np.prod([len(SEARCH_SPACE[name]) for name in names]))
+    rng = random.Random(seed)
+    picks = rng.sample(range(grid_size), min(n_trials, grid_size))
+    configs = []
+    for pick in picks:
+        params = {}
+        for name in names:
+            values = SEARCH_SPACE[name]
+            pick, i = divmod(pick, len(values))
+            params[name] = values[i]
+        configs.append(params)
+    return configs
+
+
+def _init_worker(datasets: Dict[str, Tuple[np.ndarray, np.ndarray]]):
+    global _datasets
+    _datasets = datasets
+
+
+def _run_trial(kind: str, params: Dict, n_splits: int) -> Dict:
+    """Time-ordered cross-validation of one configuration, with early stopping"""
+    estimator, metric, _ = MODEL_KINDS[kind]
+    X, y = _datasets[kind]
+    start = time.perf_counter()
+    scores, rounds = [], []
+    try:
+        for train_idx, val_idx in TimeSeriesSplit(n_splits=n_splits).split(X):
+            stop = int(len(train_idx) * (1 - EARLY_STOPPING_FRACTION))
+            fit_idx, stop_idx = train_idx[:stop], train_idx[stop:]
+            model = estimator(
+                n_estimators=MAX_ESTIMATORS,
+                early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                n_jobs=1,
+                random_state=42,
+                **params
+            )
+            model.fit(X[fit_idx], y[fit_idx], eval_set=[(X[stop_idx], y[stop_idx])], verbose=False)
+            scores.append(metric(y[val_idx], model, X[val_idx]))
+            rounds.append(model.best_iteration + 1)
+        score = float(np.mean(scores))
+        error = None
+    except Exception as e:
+        # e.g. a fold missing an outcome class on tiny datasets
+        score, error = float("inf"), str(e)
+    return {
+        "model": kind,
+        "params": params,
+        "score": score,
+        "n_estimators": int(np.mean(rounds)) if rounds else None,
+        "seconds": time.perf_counter() - start,
+        "error": error
+    }
+
+
+def search_hyperparameters(datasets: Dict[str, Tuple[np.ndarray, np.ndarray]],
+                           n_trials: int = 20, n_splits: int = 3,
+                           workers: Optional[int] = None, seed: int = 42) -> Dict:
+    """Evaluate n_trials configurations per model kind across a process pool
+
+    `datasets` maps "outcome" / "score" to (X, y) in kickoff order, so each
+    fold validates on matches played after the ones it trained on. Every
+    trial fits single-threaded; the pool supplies the parallelism. Returns
+    the best trial per model kind (with the mean early-stopped number of
+    rounds as n_estimators) plus the full trial log.
+    """
+    workers = workers or TRAIN_WORKERS
+    configs = sample_params(n_trials, seed)
+    trials = []
+    start = time.perf_counter()
+    # Data goes to each worker once, not once per trial
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                             initargs=({kind: (np.asarray(X), np.asarray(y)) for kind, (X, y) in datasets.items()},)) as pool:
+        futures = [
+            pool.submit(_run_trial, kind, params, n_splits)
+            for kind in datasets for params in configs
+        ]
+        for future in as_completed(futures):
+            trial = future.result()
+            trials.append(trial)
+            metric_name = MODEL_KINDS[trial["model"]][2]
+            outcome = trial["error"] or f"{metric_name}={trial['score']:.4f} rounds={trial['n_estimators']}"
+            print(f"  [{len(trials):>3}/{len(futures)}] {trial['model']:<8}{trial['seconds']:>7.2f}s  "
+                  f"{outcome}  {trial['params']}")
+
+    best = {}
+    for kind in datasets:
+        kind_trials = [t for t in trials if t["model"] == kind and t["error"] is None]
+        if kind_trials:
+            winner = min(kind_trials, key=lambda t: t["score"])
+            best[kind] = {
+                "params": winner["params"],
+                "n_estimators": winner["n_estimators"],
+                "metric": MODEL_KINDS[kind][2],
+                "cv_score": winner["score"]
+            }
+    return {
+        "best": best,
+        "trials": trials,
+        "n_splits": n_splits,
+        "workers": workers,
+        "seconds": time.perf_counter() - start
+    }
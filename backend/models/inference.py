@@ -0,0 +1,55 @@
+import numpy as np
+from typing import Callable, Optional, Tuple
+
+import xgboost as xgb
+
+from data.feature_engineering import N_FEATURES
+
+
+def _row_predictor(model, proba: bool = False) -> Callable[[np.ndarray], np.ndarray]:
+    """Fastest prediction call for a model, taking a float32 (n, N_FEATURES) array
+
+    XGBoost models are called through the booster's inplace_predict, which
+    reads the NumPy buffer directly: no DMatrix, no sklearn input validation.
+    Anything else (e.g. the RandomForest fallback) goes through its wrapper.
+    """
+    if isinstance(model, xgb.XGBModel) and (not proba or model.objective == "multi:softprob"):
+        booster = model.get_booster()
+        # Same trees the sklearn wrapper would use after early stopping
+        try:
+            iteration_range = (0, model.best_iteration + 1)
+        except AttributeError:
+            iteration_range = (0, 0)
+        missing = model.missing
+
+        def predict(X: np.ndarray) -> np.ndarray:
+            return booster.inplace_predict(
+                X, iteration_range=iteration_range, missing=missing, validate_features=False
+            )
+        return predict
+    return model.predict_proba if proba else model.predict
+
+
+class RowPredictor:
+    """Single-fixture inference over one reusable float32 feature buffer
+
+    Callers write a fixture's features into `row` and call `predict()` in the
+    same synchronous step. The outcome model runs once; the predicted class
+    is the argmax of its probabilities rather than a second `predict` pass.
+    """
+
+    def __init__(self, model, score_model=None, n_features: int = N_FEATURES):
+        self.row = np.zeros((1, n_features), dtype=np.float32)
+        self._outcome = _row_predictor(model, proba=True)
+        self._score = _row_predictor(score_model) if score_model is not None else None
+
+    def predict(self) -> Tuple[np.ndarray, int]:
+        """Outcome probabilities and the predicted class for the buffered row"""
+        probs = self._outcome(self.row)[0]
+        return probs, int(np.argmax(probs))
+
+    def predict_scores(self) -> Optional[np.ndarray]:
+        """Predicted (home, away) goals for the buffered row, if there is a score model"""
+        if self._score is None:
+            return None
+        return self._score(self.row)[0]
@@ -0,0 +1,147 @@
+import os
+import json
+import pickle
+import shutil
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+import xgboost as xgb
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MODEL_REGISTRY_DIR = os.getenv(
+    "MODEL_REGISTRY_DIR", os.path.join(BACKEND_DIR, "models", "trained", "registry")
+)
+MANIFEST_FILE = "manifest.json"
+LATEST_FILE = "LATEST"
+
+
+class ModelRegistry:
+    """Versioned model artifacts on disk
+
+    Each version is a directory holding the outcome and score models plus a
+    manifest.json (feature schema, training date, metrics, parameters).
+    XGBoost models are stored in the native UBJSON format and loaded by the
+    C++ library straight from the file; other estimators fall back to
+    pickle. Versions are written to a temporary directory and renamed into
+    place, so a reader never sees a half-written version, and LATEST is
+    replaced atomically.
+    """
+
+    def __init__(self, root: str = MODEL_REGISTRY_DIR):
+        self.root = root
+
+    def _version_dir(self, version: str) -> str:
+        if not version or os.path.basename(version) != version or version.startswith("."):
+            raise ValueError(f"Invalid model version: {version!r}")
+        return os.path.join(self.root, version)
+
+    def list_versions(self) -> List[str]:
+        """All complete versions, oldest first"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            name for name in os.listdir(self.root)
+            if not name.startswith(".")
+            and os.path.isfile(os.path.join(self.root, name, MANIFEST_FILE))
+        )
+
+    def latest_version(self) -> Optional[str]:
+        """Version named in LATEST, or the newest version directory"""
+        latest_path = os.path.join(self.root, LATEST_FILE)
+        if os.path.exists(latest_path):
+            with open(latest_path) as f:
+                version = f.read().strip()
+        else:
+            version = None
+        versions = self.list_versions()
+        if version in versions:
+            return version
+        return versions[-1] if versions else None
+
+    def read_manifest(self, version: str) -> Dict:
+        with open(os.path.join(self._version_dir(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+
+    def _save_model(self, model, directory: str, name: str) -> Dict:
+        if isinstance(model, xgb.XGBModel):
+            filename = f"{name}.ubj"
+            model.save_model(os.path.join(directory, filename))
+            return {"file": filename, "format": "xgboost", "class": type(model).__name__}
+        filename = f"{name}.pkl"
+        with open(os.path.join(directory, filename), "wb") as f:
+            pickle.dump(model, f)
+        return {"file": filename, "format": "pickle", "class": type(model).__name__}
+
+    def _load_model(self, directory: str, entry: Dict):
+        path = os.path.join(directory, entry["file"])
+        if entry["format"] == "xgboost":
+            model = getattr(xgb, entry["class"])()
+            model.load_model(path)
+            return model
+        with open(path, "rb") as f:
+            return pickle.load(f)
+
+    def save(self, outcome_model, score_model=None, metadata: Optional[Dict] = None,
+             set_latest: bool = True) -> str:
+        """Write a new version and (by default) point LATEST at it"""
+        os.makedirs(self.root, exist_ok=True)
+        created_at = datetime.now()
+        version = created_at.strftime("%Y%m%dT%H%M%S")
+        suffix = 1
+        while os.path.exists(self._version_dir(version)):
+            suffix += 1
+            version = f"{created_at.strftime('%Y%m%dT%H%M%S')}-{suffix}"
+
+        tmp_dir = os.path.join(self.root, f".{version}.tmp")
+        os.makedirs(tmp_dir)
+        try:
+            models = {"outcome": self._save_model(outcome_model, tmp_dir, "outcome")}
+            if score_model is not None:
+                models["score"] = self._save_model(score_model, tmp_dir, "score")
+
+            manifest = dict(metadata or {})
+            manifest.update({
+                "version": version,
+                "created_at": created_at.isoformat(),
+                "models": models
+            })
+            with open(os.path.join(tmp_dir, MANIFEST_FILE), "w") as f:
+                json.dump(manifest, f, indent=2, default=str)
+
+            os.rename(tmp_dir, self._version_dir(version))
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        if set_latest:
+            self.set_latest(version)
+        return version
+
+    def write_json(self, version: str, filename: str, data: Dict):
+        """Add a JSON document (e.g. a training report) to an existing version"""
+        directory = self._version_dir(version)
+        tmp_path = os.path.join(directory, f".{filename}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(tmp_path, os.path.join(directory, filename))
+
+    def set_latest(self, version: str):
+        """Point LATEST at an existing version"""
+        if not os.path.isfile(os.path.join(self._version_dir(version), MANIFEST_FILE)):
+            raise ValueError(f"Unknown model version: {version}")
+        tmp_path = os.path.join(self.root, f".{LATEST_FILE}.tmp")
+        with open(tmp_path, "w") as f:
+            f.write(version)
+        os.replace(tmp_path, os.path.join(self.root, LATEST_FILE))
+
+    def load(self, version: Optional[str] = None) -> Tuple[object, Optional[object], Dict]:
+        """Load (outcome_model, score_model, manifest) for a version (default: latest)"""
+        version = version or self.latest_version()
+        if version is None:
+            raise FileNotFoundError(f"No model versions in {self.root}")
+        directory = self._version_dir(version)
+        manifest = self.read_manifest(version)
+        models = manifest["models"]
+        outcome_model = self._load_model(directory, models["outcome"])
+        score_model = self._load_model(directory, models["score"]) if "score" in models else None
+        return outcome_model, score_model, manifest
@@ -1,63 +1,210 @@
 import pickle
 import os
 import numpy as np
-from typing import Optional
+from typing import Optional, List, Tuple, Dict
 import asyncio
+import functools
+from datetime import datetime
 
-from database.db import Database
-from data.feature_engineering import FeatureEngineer
+from database.async_db import AsyncDatabase
+from data.data_fetcher import DataFetcher
+from data.feature_engineering import FeatureEngineer, FEATURE_NAMES
+from data.refresh_scheduler import REFRESH_ENABLED, upcoming_fixtures
+from data.team_resolver import normalize_team_name
+from models.inference import RowPredictor
+from models.model_registry import ModelRegistry
+from models.prediction_cache import PredictionCache
+from models.season_simulator import SeasonSimulator, fixtures_to_indices
+
+# Seconds between checks of the model registry for a new version (0 disables)
+MODEL_WATCH_INTERVAL = float(os.getenv("MODEL_WATCH_INTERVAL", "30"))
 
 
 class MatchPredictor:
     """Predicts match outcomes using trained ML models"""
     
-    def __init__(self):
+    def __init__(self, data_fetcher: Optional[DataFetcher] = None):
         self.model = None
         self.score_model = None
+        # Single-fixture fast path over the loaded models
+        self.runtime: Optional[RowPredictor] = None
         self.model_loaded = False
-        self.db = Database()
+        # Bumped on every successful load; part of prediction cache keys
+        self.model_version = 0
+        # Registry version and manifest of the loaded artifacts
+        self.registry = ModelRegistry()
+        self.artifact_version: Optional[str] = None
+        self.manifest: Optional[Dict] = None
+        # Serializes hot reloads
+        self._reload_lock: Optional[asyncio.Lock] = None
+        self.db = AsyncDatabase()
+        # Reuse the app-wide fetcher (and its HTTP session) when provided
+        self.data_fetcher = data_fetcher or DataFetcher(resolver=self.db.resolver)
         self.feature_engineer = FeatureEngineer()
         # Get the backend directory (parent of models directory)
         backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.model_path = os.path.join(backend_dir, "models", "trained", "match_predictor.pkl")
         self.score_model_path = os.path.join(backend_dir, "models", "trained", "score_predictor.pkl")
+        # Precomputed predictions for all scheduled fixtures
+        self._upcoming_cache: Optional[Dict] = None
+        self._upcoming_lock: Optional[asyncio.Lock] = None
+        # Single-fixture predictions keyed by team pair + stats/model versions
+        self.cache = PredictionCache()
     
-    def load_model(self):
-        """Load trained models from disk"""
+    def _read_models(self, version: Optional[str] = None) -> Optional[Tuple]:
+        """Read (model, score_model, manifest) from disk without touching the live models
+        
+        Uses the given registry version, else the registry's latest. Falls
+        back to the legacy pickles when the registry is empty.
+        """
+        if version or self.registry.latest_version():
+            model, score_model, manifest = self.registry.load(version)
+            if manifest.get("feature_names") != FEATURE_NAMES:
+                print(f"Warning: model {manifest['version']} was trained on a different feature schema")
+            return model, score_model, manifest
+        
+        # Ensure models directory exists
+        models_dir = os.path.dirname(self.model_path)
+        os.makedirs(models_dir, exist_ok=True)
+        
+        if not os.path.exists(self.model_path):
+            return None
+        with open(self.model_path, 'rb') as f:
+            model = pickle.load(f)
+        
+        score_model = None
+        if os.path.exists(self.score_model_path):
+            with open(self.score_model_path, 'rb') as f:
+                score_model = pickle.load(f)
+        return model, score_model, None
+    
+    def _install(self, model, score_model, manifest: Optional[Dict]):
+        """Make freshly read models live
+        
+        Runs on the event loop thread with no await in between, so a request
+        sees either the old pair or the new pair, never a mix. Requests
+        already in flight keep the models they started with.
+        """
+        runtime = RowPredictor(model, score_model)
+        self.model, self.score_model, self.runtime = model, score_model, runtime
+        self.manifest = manifest
+        self.artifact_version = manifest["version"] if manifest else None
+        self.model_loaded = True
+        self.model_version += 1
+    
+    def load_model(self, version: Optional[str] = None) -> bool:
+        """Load trained models (version, else MODEL_VERSION, else latest)"""
+        version = version or os.getenv("MODEL_VERSION") or None
         try:
-            # Ensure models directory exists
-            models_dir = os.path.dirname(self.model_path)
-            os.makedirs(models_dir, exist_ok=True)
-            
-            if os.path.exists(self.model_path):
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
-                self.model_loaded = True
-            
-            if os.path.exists(self.score_model_path):
-                with open(self.score_model_path, 'rb') as f:
-                    self.score_model = pickle.load(f)
+            loaded = self._read_models(version)
         except Exception as e:
             print(f"Error loading model: {e}")
-            self.model_loaded = False
+            return False
+        if loaded is None:
+            return False
+        self._install(*loaded)
+        return True
+    
+    async def reload_model(self, version: Optional[str] = None) -> bool:
+        """Load models in the background and swap them in without downtime
+        
+        Deserialization runs on a worker thread; the current models keep
+        serving until the new ones are fully loaded. On failure the current
+        models stay live.
+        """
+        # Created lazily so it binds to the running event loop
+        if self._reload_lock is None:
+            self._reload_lock = asyncio.Lock()
+        
+        async with self._reload_lock:
+            version = version or os.getenv("MODEL_VERSION") or None
+            loop = asyncio.get_running_loop()
+            try:
+                loaded = await loop.run_in_executor(None, self._read_models, version)
+            except Exception as e:
+                print(f"Error reloading model version {version or 'latest'}: {e}")
+                return False
+            if loaded is None:
+                return False
+            self._install(*loaded)
+            print(f"Loaded model version {self.artifact_version or 'legacy'}")
+            return True
+    
+    async def watch_models(self, interval: float = MODEL_WATCH_INTERVAL, reload=None):
+        """Poll the registry and hot-swap whenever LATEST moves to a new version
+        
+        Only a change of LATEST triggers a reload, so a version chosen through
+        reload_model stays live until the next training run publishes. A
+        failed reload is retried on the next poll. `reload` (default
+        reload_model) takes the version and returns whether it was swapped in.
+        """
+        reload = reload or self.reload_model
+        loop = asyncio.get_running_loop()
+        seen = self.artifact_version
+        while True:
+            await asyncio.sleep(interval)
+            # A pinned MODEL_VERSION is only changed through reload_model
+            if os.getenv("MODEL_VERSION"):
+                continue
+            try:
+                latest = await loop.run_in_executor(None, self.registry.latest_version)
+            except OSError as e:
+                print(f"Could not read model registry: {e}")
+                continue
+            if latest and latest != seen and await reload(latest):
+                seen = latest
+    
+    def _cache_key(self, home_team: str, away_team: str) -> tuple:
+        """Normalized team pair plus the versions the prediction depends on"""
+        resolver = self.db.resolver
+        home = resolver.resolve(home_team)
+        away = resolver.resolve(away_team)
+        return (
+            home if home is not None else normalize_team_name(home_team),
+            away if away is not None else normalize_team_name(away_team),
+            self.db.team_stats_version(home_team),
+            self.db.team_stats_version(away_team),
+            self.model_version
+        )
     
     async def predict(self, home_team: str, away_team: str):
+        """Predict match outcome, serving repeated fixtures from the cache"""
+        # Snapshot the versions before reading stats: a write that lands while
+        # predicting leaves this entry under the old versions, never the new
+        key = self._cache_key(home_team, away_team)
+        cached = self.cache.get(key)
+        if cached is None:
+            cached = await self._predict_uncached(home_team, away_team)
+            # Skip caching if a reload swapped the models mid-prediction
+            if key[-1] == self.model_version:
+                self.cache.put(key, cached)
+        
+        # Echo the caller's spelling of the team names
+        prediction = dict(cached)
+        prediction["home_team"] = home_team
+        prediction["away_team"] = away_team
+        return prediction
+    
+    async def _predict_uncached(self, home_team: str, away_team: str):
         """Predict match outcome"""
         if not self.model_loaded:
             # Fallback to simple prediction based on stats
             return await self._simple_predict(home_team, away_team)
         
+        # Finish on the models this request started with, even if a reload lands meanwhile
+        runtime = self.runtime
+        
         # Get team features
-        features = await self.feature_engineer.get_match_features(home_team, away_team)
+        features = await self.feature_engineer.get_match_row(home_team, away_team)
         
         if features is None:
             return await self._simple_predict(home_team, away_team)
         
-        # Check if feature count matches model (handle shape mismatch)
+        # Fill the reusable buffer and run both models with no await in between
         try:
-            # Predict outcome
-            outcome_probs = self.model.predict_proba([features])[0]
-            outcome_pred = self.model.predict([features])[0]
+            runtime.row[:] = features
+            # One outcome pass; the predicted class is the most probable one
+            outcome_probs, outcome_pred = runtime.predict()
         except (ValueError, Exception) as e:
             # If feature shape mismatch or any error, use simple prediction
             print(f"Model prediction error: {e}. Using simple prediction.")
@@ -69,13 +216,13 @@ class MatchPredictor:
         
         # Predict scores if model available
         home_score, away_score = None, None
-        if self.score_model:
-            try:
-                scores = self.score_model.predict([features])[0]
-                home_score = max(0, int(round(scores[0])))
-                away_score = max(0, int(round(scores[1])))
-            except:
-                pass
+        try:
+            scores = runtime.predict_scores()
+            if scores is not None:
+                home_score = max(0, int(round(float(scores[0]))))
+                away_score = max(0, int(round(float(scores[1]))))
+        except:
+            pass
         
         return {
             "home_team": home_team,
@@ -89,14 +236,107 @@ class MatchPredictor:
             "confidence": float(max(outcome_probs))
         }
     
+    async def predict_many(self, fixtures: List[Tuple[str, str]]) -> List[Dict]:
+        """Predict many fixtures with one pass of each model over a feature matrix"""
+        if not fixtures:
+            return []
+        if not self.model_loaded:
+            return list(await asyncio.gather(*[self._simple_predict(home, away) for home, away in fixtures]))
+        
+        model, score_model = self.model, self.score_model
+        
+        # One stats read per distinct team, one vectorized feature build
+        features, valid = await self.feature_engineer.get_fixture_matrix(fixtures)
+        rows = np.flatnonzero(valid).tolist()
+        predictions: List[Optional[Dict]] = [None] * len(fixtures)
+        
+        if rows:
+            X = features[rows]
+            try:
+                # Predicted class is the most probable one; no second model pass
+                outcome_probs = model.predict_proba(X)
+            except (ValueError, Exception) as e:
+                print(f"Model prediction error: {e}. Using simple prediction.")
+                rows, outcome_probs = [], None
+            
+            scores = None
+            if rows and score_model:
+                try:
+                    scores = score_model.predict(X)
+                except:
+                    scores = None
+            
+            result_map = {0: "HOME_WIN", 1: "DRAW", 2: "AWAY_WIN"}
+            for row, i in enumerate(rows):
+                home_team, away_team = fixtures[i]
+                probs = outcome_probs[row]
+                home_score, away_score = None, None
+                if scores is not None:
+                    home_score = max(0, int(round(scores[row][0])))
+                    away_score = max(0, int(round(scores[row][1])))
+                predictions[i] = {
+                    "home_team": home_team,
+                    "away_team": away_team,
+                    "predicted_result": result_map[int(np.argmax(probs))],
+                    "home_win_probability": float(probs[0]),
+                    "draw_probability": float(probs[1]),
+                    "away_win_probability": float(probs[2]),
+                    "predicted_home_score": home_score,
+                    "predicted_away_score": away_score,
+                    "confidence": float(max(probs))
+                }
+        
+        # Fixtures without features (or after a model error) use the stats fallback
+        missing = [i for i, p in enumerate(predictions) if p is None]
+        fallbacks = await asyncio.gather(*[self._simple_predict(*fixtures[i]) for i in missing])
+        for i, prediction in zip(missing, fallbacks):
+            predictions[i] = prediction
+        return predictions
+    
+    async def predict_upcoming(self) -> Dict:
+        """Predictions for every scheduled fixture, cached per stats/model version"""
+        fixtures = await upcoming_fixtures(self.db, self.data_fetcher)
+        key = (
+            self.db.stats_version(),
+            self.model_version,
+            tuple(match.get("id") for match in fixtures)
+        )
+        if self._upcoming_cache and self._upcoming_cache["key"] == key:
+            return self._upcoming_cache["result"]
+        
+        # Created lazily so it binds to the running event loop
+        if self._upcoming_lock is None:
+            self._upcoming_lock = asyncio.Lock()
+        
+        async with self._upcoming_lock:
+            # Another request may have filled the cache while we waited
+            if self._upcoming_cache and self._upcoming_cache["key"] == key:
+                return self._upcoming_cache["result"]
+            
+            predictions = await self.predict_many([
+                (match["home_team"], match["away_team"]) for match in fixtures
+            ])
+            for match, prediction in zip(fixtures, predictions):
+                prediction["match_id"] = match.get("id")
+                prediction["date"] = match.get("date")
+            
+            result = {
+                "generated_at": datetime.now(),
+                "stats_version": key[0],
+                "model_version": key[1],
+                "predictions": predictions
+            }
+            self._upcoming_cache = {"key": key, "result": result}
+            return result
+    
     async def _simple_predict(self, home_team: str, away_team: str):
         """Simple prediction based on team stats when model not available"""
-        # Try to fetch stats if not in database (with timeout)
-        from data.data_fetcher import DataFetcher
-        data_fetcher = DataFetcher()
+        # Try to fetch stats if not in database (with timeout), unless the
+        # background refresh owns upstream access
+        data_fetcher = self.data_fetcher
         
-        home_stats = self.db.get_team_stats(home_team)
-        if not home_stats:
+        home_stats = await self.db.get_team_stats(home_team)
+        if not home_stats and not REFRESH_ENABLED:
             # Try to fetch from API with timeout
             try:
                 stats = await asyncio.wait_for(
@@ -104,13 +344,13 @@ class MatchPredictor:
                     timeout=5.0
                 )
                 if stats:
-                    self.db.save_team_stats(home_team, stats)
-                    home_stats = self.db.get_team_stats(home_team)
+                    await self.db.save_team_stats(home_team, stats)
+                    home_stats = await self.db.get_team_stats(home_team)
             except (asyncio.TimeoutError, Exception) as e:
                 print(f"Could not fetch stats for {home_team}: {e}")
         
-        away_stats = self.db.get_team_stats(away_team)
-        if not away_stats:
+        away_stats = await self.db.get_team_stats(away_team)
+        if not away_stats and not REFRESH_ENABLED:
             # Try to fetch from API with timeout
             try:
                 stats = await asyncio.wait_for(
@@ -118,8 +358,8 @@ class MatchPredictor:
                     timeout=5.0
                 )
                 if stats:
-                    self.db.save_team_stats(away_team, stats)
-                    away_stats = self.db.get_team_stats(away_team)
+                    await self.db.save_team_stats(away_team, stats)
+                    away_stats = await self.db.get_team_stats(away_team)
             except (asyncio.TimeoutError, Exception) as e:
                 print(f"Could not fetch stats for {away_team}: {e}")
         
@@ -209,43 +449,66 @@ class MatchPredictor:
 class SeasonPredictor:
     """Predicts entire season standings"""
     
-    def __init__(self):
+    def __init__(self, data_fetcher: Optional[DataFetcher] = None,
+                 match_predictor: Optional[MatchPredictor] = None):
         self.model = None
         self.model_loaded = False
-        self.db = Database()
+        self.db = AsyncDatabase()
+        self.data_fetcher = data_fetcher or DataFetcher(resolver=self.db.resolver)
+        # Supplies per-fixture outcome probabilities for the simulation
+        self.match_predictor = match_predictor
+        self.simulator = SeasonSimulator()
         # Get the backend directory (parent of models directory)
         backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
         self.model_path = os.path.join(backend_dir, "models", "trained", "season_predictor.pkl")
     
+    def _read_model(self):
+        # Ensure models directory exists
+        models_dir = os.path.dirname(self.model_path)
+        os.makedirs(models_dir, exist_ok=True)
+        
+        if not os.path.exists(self.model_path):
+            return None
+        with open(self.model_path, 'rb') as f:
+            return pickle.load(f)
+    
     def load_model(self):
         """Load trained season prediction model"""
         try:
-            # Ensure models directory exists
-            models_dir = os.path.dirname(self.model_path)
-            os.makedirs(models_dir, exist_ok=True)
-            
-            if os.path.exists(self.model_path):
-                with open(self.model_path, 'rb') as f:
-                    self.model = pickle.load(f)
+            model = self._read_model()
+            if model is not None:
+                self.model = model
                 self.model_loaded = True
         except Exception as e:
             print(f"Error loading season model: {e}")
     
+    async def reload_model(self) -> bool:
+        """Re-read the season model on a worker thread and swap it in"""
+        loop = asyncio.get_running_loop()
+        try:
+            model = await loop.run_in_executor(None, self._read_model)
+        except Exception as e:
+            print(f"Error reloading season model: {e}")
+            return False
+        if model is None:
+            return False
+        self.model = model
+        self.model_loaded = True
+        return True
+    
     async def predict_season(self):
         """Predict season standings"""
-        from datetime import datetime
-        from data.data_fetcher import DataFetcher
-        
-        data_fetcher = DataFetcher()
+        data_fetcher = self.data_fetcher
         
-        # Get teams from database, or fetch from API if not available
-        teams = self.db.get_teams()
-        if not teams or len(teams) < 20:
+        # Get teams from database, or fetch from API if not available (the
+        # background refresh, when enabled, keeps both teams and stats stored)
+        teams = await self.db.get_teams()
+        if (not teams or len(teams) < 20) and not REFRESH_ENABLED:
             # Fetch all teams from API to ensure we have all 20
             teams_data = await data_fetcher.fetch_teams()
             if teams_data:
-                self.db.save_teams(teams_data)
-                teams = self.db.get_teams()
+                await self.db.save_teams(teams_data)
+                teams = await self.db.get_teams()
         
         if not teams:
             return {
@@ -258,35 +521,53 @@ class SeasonPredictor:
         
         # Get current season data for ALL teams
         # Use database stats first (faster), only fetch from API if missing
+        stats_list = await asyncio.gather(*[self.db.get_team_stats(team['name']) for team in teams])
+        team_stats = dict(zip([team['name'] for team in teams], stats_list))
+        if not all(team_stats.values()) and not REFRESH_ENABLED:
+            # One standings snapshot covers every team; persist it in bulk
+            snapshot = await data_fetcher.fetch_standings()
+            if snapshot:
+                await self.db.save_team_stats_bulk(list(snapshot.values()))
+                for name, stats in team_stats.items():
+                    if not stats:
+                        team_stats[name] = await self.db.get_team_stats(name)
+        
+        simulation = await self._simulate_remaining(teams, team_stats)
+        
         standings = []
-        for team in teams:
-            # Try database first (much faster)
-            stats = self.db.get_team_stats(team['name'])
+        for i, team in enumerate(teams):
+            stats = team_stats[team['name']]
             
-            # If no stats in database, try to fetch from API
-            if not stats:
-                stats = await data_fetcher.fetch_team_stats(team['name'])
-                if stats:
-                    self.db.save_team_stats(team['name'], stats)
-            
-            # Simple prediction: extrapolate current form
             matches_played = stats.get('matches_played', 0) if stats else 0
             current_points = stats.get('points', 0) if stats else 0
             current_position = stats.get('position', 0) if stats else 0
             
-            if matches_played > 0:
+            if simulation:
+                predicted_points = simulation["expected_points"][i]
+            elif matches_played > 0:
+                # No fixture list: extrapolate current form
                 points_per_game = current_points / matches_played
                 predicted_points = points_per_game * 38  # 38 games in a season
             else:
                 # Default prediction for teams without matches played yet
                 predicted_points = 50  # Average points
             
-            standings.append({
+            entry = {
                 "team": team['name'],
-                "predicted_points": round(predicted_points, 1),
+                "predicted_points": round(float(predicted_points), 1),
                 "current_points": current_points,
                 "current_position": current_position if current_position > 0 else 20  # Default to bottom if no position
-            })
+            }
+            if simulation:
+                entry.update({
+                    "expected_position": round(float(simulation["expected_position"][i]), 2),
+                    "title_probability": round(float(simulation["title_probability"][i]), 4),
+                    "relegation_probability": round(float(simulation["relegation_probability"][i]), 4),
+                    "position_probabilities": [
+                        round(float(p), 4) for p in simulation["position_probabilities"][i]
+                    ]
+                })
+            standings.append(entry)
         
         # Sort by predicted points
         standings.sort(key=lambda x: x['predicted_points'], reverse=True)
@@ -303,6 +584,44 @@ class SeasonPredictor:
             "predicted_standings": standings,
             "predicted_champion": predicted_champion,
             "predicted_relegated": predicted_relegated,
+            "simulations": simulation["simulations"] if simulation else None,
             "updated_at": datetime.now()
         }
+    
+    async def _simulate_remaining(self, teams: List[Dict], team_stats: Dict[str, Optional[Dict]]) -> Optional[Dict]:
+        """Monte Carlo simulation of the remaining fixtures, or None if unavailable"""
+        if self.match_predictor is None:
+            return None
+        
+        fixtures = await upcoming_fixtures(self.db, self.data_fetcher)
+        if not fixtures:
+            return None
+        
+        # Fixture names resolve to the same canonical ids as the teams table
+        index_by_id = {team['id']: i for i, team in enumerate(teams)}
+        resolver = self.db.resolver
+        home_idx, away_idx, kept = fixtures_to_indices(
+            fixtures, lambda name: index_by_id.get(resolver.resolve(name))
+        )
+        if not kept:
+            return None
+        
+        predictions = await self.match_predictor.predict_many([
+            (fixtures[i]["home_team"], fixtures[i]["away_team"]) for i in kept
+        ])
+        probabilities = np.array([
+            [p["home_win_probability"], p["draw_probability"], p["away_win_probability"]]
+            for p in predictions
+        ])
+        
+        current_points = [(team_stats[t['name']] or {}).get('points', 0) for t in teams]
+        goal_diff = [(team_stats[t['name']] or {}).get('goal_diff', 0) for t in teams]
+        
+        # CPU-bound but releases the GIL in NumPy; keep it off the event loop
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(
+            self.simulator.simulate,
+            [t['name'] for t in teams], current_points, home_idx, away_idx,
+            probabilities, goal_diff
+        ))
 
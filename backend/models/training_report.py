@@ -0,0 +1,86 @@
+import os
+import sys
+import time
+import platform
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, List, Optional
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_FILE = "training_report.json"
+
+
+def _peak_rss_mb(who) -> Optional[float]:
+    """Peak resident set size so far, in MB (ru_maxrss is KB on Linux, bytes on macOS)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(who).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def _current_rss_mb() -> Optional[float]:
+    """Current resident set size in MB, where /proc is available"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+class TrainingReport:
+    """Wall time, memory and row counts for each stage of a training run
+
+    Stages are recorded in order. Peak RSS is the process high-water mark
+    when the stage ended (so a stage that raised it shows a jump), and
+    children_peak_rss_mb covers worker processes such as the search pool.
+    A stage can attach counts by setting keys on the dict it yields.
+    """
+
+    def __init__(self):
+        self.started_at = datetime.now()
+        self.stages: List[Dict] = []
+
+    @contextmanager
+    def stage(self, name: str):
+        entry = {"name": name}
+        rss_before = _current_rss_mb()
+        start = time.perf_counter()
+        try:
+            yield entry
+        finally:
+            entry["seconds"] = time.perf_counter() - start
+            rss_after = _current_rss_mb()
+            entry["rss_mb"] = rss_after
+            if rss_before is not None and rss_after is not None:
+                entry["rss_delta_mb"] = rss_after - rss_before
+            entry["peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_SELF) if resource else None
+            entry["children_peak_rss_mb"] = _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None
+            self.stages.append(entry)
+
+    def to_dict(self) -> Dict:
+        return {
+            "started_at": self.started_at.isoformat(),
+            "total_seconds": sum(entry["seconds"] for entry in self.stages),
+            "peak_rss_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            "children_peak_rss_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            "cpu_count": os.cpu_count(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "stages": self.stages
+        }
+
+    def print_summary(self):
+        total = sum(entry["seconds"] for entry in self.stages)
+        print("\nStage timings:")
+        for entry in self.stages:
+            share = entry["seconds"] / total if total else 0.0
+            peak = entry.get("peak_rss_mb")
+            rows = entry.get("rows")
+            print(f"  {entry['name']:<24}{entry['seconds']:>9.3f}s {share:>7.1%}"
+                  + (f"  peak {peak:>7.1f} MB" if peak is not None else "")
+                  + (f"  {rows} rows" if rows is not None else ""))
+        print(f"  {'total':<24}{total:>9.3f}s")
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime
 
@@ -33,11 +33,33 @@ class MatchPrediction(BaseModel):
     confidence: float
 
 
+class UpcomingMatchPrediction(MatchPrediction):
+    match_id: int
+    date: Optional[datetime] = None
+
+
+class UpcomingPredictions(BaseModel):
+    generated_at: datetime
+    stats_version: int  # Bumped when team stats change
+    model_version: int  # Bumped when a model is (re)loaded
+    predictions: List[UpcomingMatchPrediction]
+
+
+class Fixture(BaseModel):
+    home_team: str
+    away_team: str
+
+
+class BatchMatchPredictionRequest(BaseModel):
+    fixtures: List[Fixture] = Field(..., min_length=1, max_length=400)  # Up to a full season
+
+
 class SeasonPrediction(BaseModel):
     season: str
     predicted_standings: List[dict]  # List of teams with predicted points, position, etc.
     predicted_champion: str
     predicted_relegated: List[str]
+    simulations: Optional[int] = None  # Monte Carlo runs behind the standings, if simulated
     updated_at: datetime
 
 
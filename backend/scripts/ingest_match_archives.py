@@ -0,0 +1,169 @@
+"""
+Bulk-load historical match archives into the matches table
+
+Reads football-data.co.uk style CSV files (one per season; columns Date,
+Time, HomeTeam, AwayTeam, FTHG, FTAG) and inserts the finished matches in
+batched transactions. Rows are streamed, so memory does not grow with file
+size. Archive club spellings ("Nott'm Forest", "Wolves") are expanded to
+full names and stored under the API's canonical name when the team index
+knows the club, so archive and API rows name teams the same way. Each
+match gets a stable negative id derived from its natural key (kickoff day,
+home team, away team), so re-running the import skips matches already
+stored and never collides with football-data.org ids.
+
+    python scripts/ingest_match_archives.py archives/          # every *.csv
+    python scripts/ingest_match_archives.py E0_2019.csv E0_2020.csv
+"""
+import os
+import sys
+import csv
+import time
+import codecs
+import glob
+import hashlib
+import argparse
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional
+
+# Add parent directory to path
+backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(backend_dir)
+
+from data.rolling_stats import match_key
+from data.team_resolver import TeamResolver, archive_team_name
+from database.db import Database
+
+BATCH_SIZE = 5000
+DATE_FORMATS = ("%d/%m/%Y", "%d/%m/%y", "%Y-%m-%d")
+
+
+def archive_match_id(match: Dict) -> int:
+    """Stable negative id from the match's natural key (independent of the team index)"""
+    digest = hashlib.blake2b("|".join(match_key(match)).encode(), digest_size=7).digest()
+    return -int.from_bytes(digest, "big") - 1
+
+
+def parse_kickoff(day: str, kickoff_time: Optional[str]) -> Optional[str]:
+    for date_format in DATE_FORMATS:
+        try:
+            parsed = datetime.strptime(day.strip(), date_format)
+            break
+        except ValueError:
+            continue
+    else:
+        return None
+    if kickoff_time:
+        try:
+            hours, minutes = kickoff_time.strip().split(":")[:2]
+            parsed = parsed.replace(hour=int(hours), minute=int(minutes))
+        except ValueError:
+            pass
+    return parsed.isoformat()
+
+
+def team_name(name: str, resolver: Optional[TeamResolver]) -> str:
+    """Name to store for an archive club: the API's canonical name if known, else the full name"""
+    full_name = archive_team_name(name)
+    return (resolver.canonical_name(full_name) if resolver else None) or full_name
+
+
+def parse_row(row: Dict, resolver: Optional[TeamResolver] = None) -> Optional[Dict]:
+    """Match dict for a CSV row, or None for blank or unplayed rows"""
+    home = (row.get("HomeTeam") or row.get("HT") or "").strip()
+    away = (row.get("AwayTeam") or row.get("AT") or "").strip()
+    home_goals = row.get("FTHG") or row.get("HG")
+    away_goals = row.get("FTAG") or row.get("AG")
+    kickoff = parse_kickoff(row.get("Date") or "", row.get("Time"))
+    if not home or not away or not kickoff:
+        return None
+    try:
+        home_score, away_score = int(home_goals), int(away_goals)
+    except (TypeError, ValueError):
+        return None
+
+    match = {
+        "home_team": team_name(home, resolver),
+        "away_team": team_name(away, resolver),
+        "date": kickoff,
+        "home_score": home_score,
+        "away_score": away_score,
+        "status": "FINISHED"
+    }
+    match["id"] = archive_match_id(match)
+    return match
+
+
+def archive_encoding(path: str) -> str:
+    """UTF-8 (BOM allowed) if the whole file decodes as UTF-8, else Latin-1"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 16), b""):
+                decoder.decode(chunk)
+            decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        return "latin-1"
+    return "utf-8-sig"
+
+
+def read_archive(path: str, resolver: Optional[TeamResolver] = None) -> Iterator[Dict]:
+    """Stream finished matches from one CSV file"""
+    # Newer archives are UTF-8 (some with a BOM), older ones Latin-1
+    with open(path, newline="", encoding=archive_encoding(path)) as f:
+        for row in csv.DictReader(f):
+            match = parse_row(row, resolver)
+            if match is not None:
+                yield match
+
+
+def archive_paths(targets: List[str]) -> List[str]:
+    paths = []
+    for target in targets:
+        if os.path.isdir(target):
+            paths.extend(sorted(glob.glob(os.path.join(target, "*.csv"))))
+        else:
+            paths.append(target)
+    return paths
+
+
+def ingest(paths: List[str], db: Database, batch_size: int = BATCH_SIZE) -> Dict:
+    """Insert every archive's matches, one transaction per batch"""
+    totals = {"files": 0, "rows": 0, "inserted": 0}
+    start = time.perf_counter()
+    for path in paths:
+        file_start = time.perf_counter()
+        rows = inserted = 0
+        batch = []
+        for match in read_archive(path, db.resolver):
+            batch.append(match)
+            if len(batch) >= batch_size:
+                inserted += db.import_matches(batch)
+                rows += len(batch)
+                batch = []
+        inserted += db.import_matches(batch)
+        rows += len(batch)
+
+        totals["files"] += 1
+        totals["rows"] += rows
+        totals["inserted"] += inserted
+        print(f"{os.path.basename(path)}: {rows} matches, {inserted} new, "
+              f"{rows - inserted} already stored ({time.perf_counter() - file_start:.2f}s)")
+
+    totals["seconds"] = time.perf_counter() - start
+    return totals
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("archives", nargs="+", help="CSV files or directories of CSV files")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--db", default=None, help="Database path (default: the app database)")
+    args = parser.parse_args()
+
+    paths = archive_paths(args.archives)
+    if not paths:
+        sys.exit("No archive files found")
+    db = Database(args.db)
+    totals = ingest(paths, db, args.batch_size)
+    print(f"\n{totals['files']} files, {totals['rows']} matches, {totals['inserted']} new "
+          f"in {totals['seconds']:.2f}s")
@@ -4,8 +4,9 @@ Run this script to train/retrain the ML models
 """
 import os
 import sys
-import pickle
 import asyncio
+import argparse
+from typing import Optional
 import numpy as np
 from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
 from sklearn.model_selection import train_test_split
@@ -17,78 +18,90 @@ backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(backend_dir)
 
 from data.data_fetcher import DataFetcher
-from data.feature_engineering import FeatureEngineer
+from data.rate_limiter import PRIORITY_TRAINING
+from data.feature_cache import FeatureCache
+from data.feature_engineering import FEATURE_NAMES, N_FEATURES
+from data.rolling_stats import RollingTeamStats, dedupe_matches, point_in_time_features
 from database.db import Database
+from models.hyperparameter_search import search_hyperparameters
+from models.model_registry import ModelRegistry
+from models.training_report import REPORT_FILE, TrainingReport
 
-async def collect_training_data():
-    """Collect historical match data for training"""
+async def collect_training_data(report: Optional[TrainingReport] = None):
+    """Collect historical match data for training
+    
+    Each upstream resource is fetched once, concurrently, then persisted in
+    bulk. The requests share the process-wide upstream rate limit at
+    training priority, behind user and background requests.
+    """
     print("Collecting training data...")
+    report = report or TrainingReport()
     
-    data_fetcher = DataFetcher()
+    # Training collection queues behind user-facing requests for upstream quota
     db = Database()
-    feature_engineer = FeatureEngineer()
+    data_fetcher = DataFetcher(priority=PRIORITY_TRAINING, resolver=db.resolver)
     
-    # Fetch recent matches
-    matches = await data_fetcher.fetch_recent_matches(limit=200)
+    try:
+        with report.stage("fetch") as stage:
+            matches, teams, standings = await asyncio.gather(
+                data_fetcher.fetch_recent_matches(limit=200),
+                data_fetcher.fetch_teams(),
+                data_fetcher.fetch_standings()
+            )
+            stage.update(rows=len(matches), teams=len(teams), standings=len(standings))
+    finally:
+        await data_fetcher.close()
     
-    if not matches:
-        print("Warning: No matches found. Using mock data for demonstration.")
-        return create_mock_training_data()
+    # One transaction per table
+    with report.stage("persist") as stage:
+        db.save_teams(teams)
+        db.save_team_stats_bulk(list(standings.values()))
+        db.save_matches(matches)
+        stage["rows"] = len(matches)
     
-    # Fetch teams and their stats
-    teams = await data_fetcher.fetch_teams()
-    db.save_teams(teams)
+    # Train on everything stored: recent API results plus any ingested
+    # archives (scripts/ingest_match_archives.py)
+    with report.stage("load history") as stage:
+        history = dedupe_matches(db.get_finished_matches(), db.resolver)
+        stage["rows"] = len(history)
     
-    # Fetch stats for each team
-    for team in teams:
-        stats = await data_fetcher.fetch_team_stats(team['name'])
-        if stats:
-            db.save_team_stats(team['name'], stats)
+    if not history:
+        print("Warning: No matches found. Using mock data for demonstration.")
+        return create_mock_training_data()
     
-    # Build training dataset
-    X = []
-    y = []
-    X_scores = []
-    y_scores = []
+    # Reuse matrices built earlier from the same history and feature code
+    cache = FeatureCache()
+    with report.stage("feature cache lookup") as stage:
+        key = cache.key(history, db.resolver)
+        cached = cache.load(key)
+        stage.update(key=key, hit=cached is not None)
+    if cached is not None:
+        print(f"Using cached training matrices {key} ({len(cached['X'])} rows)")
+        return cached["X"], cached["y"], cached["X"], cached["y_scores"]
     
-    for match in matches:
-        if match.get('home_score') is None or match.get('away_score') is None:
-            continue
-        
-        home_team = match['home_team']
-        away_team = match['away_team']
-        
-        # Get team stats at the time (simplified - using current stats)
-        home_stats = db.get_team_stats(home_team)
-        away_stats = db.get_team_stats(away_team)
+    with report.stage("features") as stage:
+        # Replay finished matches so every row sees only the table as it
+        # stood at kickoff, not the current standings
+        X, finished = point_in_time_features(history, RollingTeamStats(resolver=db.resolver))
+        stage["rows"] = len(X)
+        if len(finished) < 10:
+            print("Not enough training data. Using mock data.")
+            return create_mock_training_data()
         
-        if not home_stats or not away_stats:
-            continue
-        
-        # Extract features
-        features = feature_engineer.extract_features_from_match(match, home_stats, away_stats)
-        X.append(features)
+        # Score prediction targets
+        y_scores = np.array([[m['home_score'], m['away_score']] for m in finished])
         
         # Determine outcome label (0: HOME_WIN, 1: DRAW, 2: AWAY_WIN)
-        home_score = match['home_score']
-        away_score = match['away_score']
-        
-        if home_score > away_score:
-            y.append(0)
-        elif home_score == away_score:
-            y.append(1)
-        else:
-            y.append(2)
-        
-        # Score prediction targets
-        X_scores.append(features)
-        y_scores.append([home_score, away_score])
+        y = np.where(y_scores[:, 0] > y_scores[:, 1], 0,
+                     np.where(y_scores[:, 0] == y_scores[:, 1], 1, 2))
     
-    if len(X) < 10:
-        print("Not enough training data. Using mock data.")
-        return create_mock_training_data()
+    with report.stage("feature cache save"):
+        cache.save(key, {"X": X, "y": y, "y_scores": y_scores}, {
+            "n_matches": len(history),
+            "feature_names": FEATURE_NAMES
+        })
     
-    return np.array(X), np.array(y), np.array(X_scores), np.array(y_scores)
+    return X, y, X, y_scores
 
 
 def create_mock_training_data():
@@ -97,7 +110,7 @@ def create_mock_training_data():
     np.random.seed(42)
     
     n_samples = 500
-    n_features = 25
+    n_features = N_FEATURES
     
     X = np.random.rand(n_samples, n_features)
     
@@ -133,32 +146,57 @@ def create_mock_training_data():
     return X, np.array(y), np.array(X_scores), np.array(y_scores)
 
 
-async def train_models():
-    """Train the prediction models"""
+async def train_models(search: bool = False, trials: int = 20, workers: Optional[int] = None):
+    """Train the prediction models
+    
+    With search=True, hyperparameters for both models are chosen by a
+    parallel, time-ordered cross-validated search instead of the defaults.
+    """
     print("Starting model training...")
     
+    report = TrainingReport()
+    
     # Collect data
-    X, y, X_scores, y_scores = await collect_training_data()
+    X, y, X_scores, y_scores = await collect_training_data(report)
     
     print(f"Training with {len(X)} samples")
     
-    # Split data
+    # Split data. The search validates on later matches, so its holdout is
+    # the most recent 20% rather than a random sample.
     X_train, X_test, y_train, y_test = train_test_split(
-        X, y, test_size=0.2, random_state=42
+        X, y, test_size=0.2, random_state=42, shuffle=not search
     )
     
     X_train_scores, X_test_scores, y_train_scores, y_test_scores = train_test_split(
-        X_scores, y_scores, test_size=0.2, random_state=42
+        X_scores, y_scores, test_size=0.2, random_state=42, shuffle=not search
     )
     
+    outcome_params = {"n_estimators": 100, "max_depth": 5, "learning_rate": 0.1}
+    score_params = dict(outcome_params)
+    search_results = None
+    if search:
+        print(f"Searching hyperparameters ({trials} trials per model)...")
+        with report.stage("hyperparameter search") as stage:
+            search_results = search_hyperparameters({
+                "outcome": (X_train, y_train),
+                "score": (X_train_scores, y_train_scores)
+            }, n_trials=trials, workers=workers)
+            stage.update(trials=len(search_results["trials"]), workers=search_results["workers"])
+        best = search_results["best"]
+        print(f"Search finished in {search_results['seconds']:.1f}s on {search_results['workers']} workers")
+        if "outcome" in best:
+            outcome_params = dict(best["outcome"]["params"], n_estimators=best["outcome"]["n_estimators"])
+            print(f"Best outcome params: {outcome_params}")
+        if "score" in best:
+            score_params = dict(best["score"]["params"], n_estimators=best["score"]["n_estimators"])
+            print(f"Best score params: {score_params}")
+    
     # Train outcome prediction model
     print("Training outcome prediction model...")
     try:
         # Try XGBoost first, fallback to Random Forest
         model = xgb.XGBClassifier(
-            n_estimators=100,
-            max_depth=5,
-            learning_rate=0.1,
+            **outcome_params,
             random_state=42
         )
     except:
@@ -168,7 +206,9 @@ async def train_models():
             random_state=42
         )
     
-    model.fit(X_train, y_train)
+    with report.stage("train outcome model") as stage:
+        model.fit(X_train, y_train)
+        stage["rows"] = len(X_train)
     
     # Evaluate
     y_pred = model.predict(X_test)
@@ -177,21 +217,11 @@ async def train_models():
     print(classification_report(y_test, y_pred, 
           target_names=['HOME_WIN', 'DRAW', 'AWAY_WIN']))
     
-    # Save outcome model
-    models_dir = os.path.join(backend_dir, "models", "trained")
-    os.makedirs(models_dir, exist_ok=True)
-    match_model_path = os.path.join(models_dir, "match_predictor.pkl")
-    with open(match_model_path, "wb") as f:
-        pickle.dump(model, f)
-    print("Saved outcome prediction model")
-    
     # Train score prediction model
     print("Training score prediction model...")
     try:
         score_model = xgb.XGBRegressor(
-            n_estimators=100,
-            max_depth=5,
-            learning_rate=0.1,
+            **score_params,
             random_state=42
         )
     except:
@@ -201,23 +231,57 @@ async def train_models():
             random_state=42
         )
     
-    score_model.fit(X_train_scores, y_train_scores)
+    with report.stage("train score model") as stage:
+        score_model.fit(X_train_scores, y_train_scores)
+        stage["rows"] = len(X_train_scores)
     
     # Evaluate score prediction
     y_pred_scores = score_model.predict(X_test_scores)
     mae = np.mean(np.abs(y_pred_scores - y_test_scores))
     print(f"Score prediction MAE: {mae:.2f} goals")
     
-    # Save score model
-    score_model_path = os.path.join(models_dir, "score_predictor.pkl")
-    with open(score_model_path, "wb") as f:
-        pickle.dump(score_model, f)
-    print("Saved score prediction model")
+    # Save both models as a new registry version
+    registry = ModelRegistry()
+    with report.stage("save"):
+        version = registry.save(model, score_model, {
+            "feature_names": FEATURE_NAMES,
+            "n_features": N_FEATURES,
+            "classes": ["HOME_WIN", "DRAW", "AWAY_WIN"],
+            "n_samples": int(len(X)),
+            "metrics": {
+                "outcome_accuracy": float(accuracy),
+                "score_mae": float(mae)
+            },
+            "params": {
+                "outcome": model.get_params(),
+                "score": score_model.get_params()
+            },
+            "search": search_results and {
+                "best": search_results["best"],
+                "n_trials": len(search_results["trials"]),
+                "n_splits": search_results["n_splits"],
+                "workers": search_results["workers"],
+                "seconds": search_results["seconds"]
+            }
+        })
+    print(f"Saved models as version {version}")
+    
+    # Timing and memory per stage, next to the models it produced
+    registry.write_json(version, REPORT_FILE, dict(
+        report.to_dict(), version=version, n_samples=int(len(X)), search=search
+    ))
     
     print("\nTraining completed successfully!")
-    print(f"Models saved to {models_dir}/")
+    print(f"Models saved to {os.path.join(registry.root, version)}/")
+    report.print_summary()
 
 
 if __name__ == "__main__":
-    asyncio.run(train_models())
+    parser = argparse.ArgumentParser(description="Train the match outcome and score models")
+    parser.add_argument("--search", action="store_true",
+                        help="choose hyperparameters with a parallel cross-validated search")
+    parser.add_argument("--trials", type=int, default=20, help="configurations tried per model")
+    parser.add_argument("--workers", type=int, default=None, help="search processes (default: all cores)")
+    args = parser.parse_args()
+    asyncio.run(train_models(search=args.search, trials=args.trials, workers=args.workers))
 
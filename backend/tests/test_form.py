@@ -0,0 +1,47 @@
+"""
+Form must mean the same thing at training and serving time
+
+Training replays finished matches (RollingTeamStats); serving reads the
+API's form string from the standings (form_to_numeric). The same history
+through both paths must give the same feature value.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+
+from data.rolling_stats import RollingTeamStats
+from data.stats_array import FORM, form_to_numeric
+
+KICKOFF = datetime(2024, 8, 17, 15, 0)
+
+
+def history(results: str):
+    """Arsenal's matches with the given results, oldest first, then one more fixture"""
+    scores = {"W": (2, 0), "D": (1, 1), "L": (0, 1)}
+    matches = [
+        {"date": KICKOFF + timedelta(weeks=i), "home_team": "Arsenal FC",
+         "away_team": f"Opponent {i}", "home_score": scores[result][0], "away_score": scores[result][1]}
+        for i, result in enumerate(results)
+    ]
+    # Its as-of-kickoff row carries the form after every result above
+    matches.append({"date": KICKOFF + timedelta(weeks=len(results)), "home_team": "Arsenal FC",
+                    "away_team": "Chelsea FC", "home_score": 0, "away_score": 0})
+    return matches
+
+
+def api_form(results: str) -> str:
+    """Form string as football-data.org reports it: last five, latest first, comma-separated"""
+    return ",".join(reversed(results[-5:]))
+
+
+@pytest.mark.parametrize("results", ["WWWWW", "WDLWW", "LLDWWWDL", "DW", ""])
+def test_training_and_serving_form_match(results):
+    home_rows, _, _ = RollingTeamStats().replay(history(results))
+    trained = home_rows[-1, FORM]
+    served = form_to_numeric(api_form(results))
+    assert served == pytest.approx(trained)
+
+
+def test_separators_do_not_shorten_form():
+    assert form_to_numeric("W,W,W,W,W") == 1.0
+    assert form_to_numeric("W,W,W,W,W") == form_to_numeric("WWWWW")
@@ -0,0 +1,38 @@
+"""
+Prediction cache keys must describe the stats a prediction was built from
+"""
+import asyncio
+
+from models.predictor import MatchPredictor
+
+
+def team_stats(team: str, points: int) -> dict:
+    return {
+        "team": team, "matches_played": 10, "wins": points // 3, "draws": points % 3,
+        "losses": 10 - points // 3 - points % 3, "goals_for": 15, "goals_against": 12,
+        "goal_diff": 3, "points": points, "position": 5, "form": "W,D,L,W,W"
+    }
+
+
+def test_stats_write_during_prediction_keeps_old_key(tmp_path, monkeypatch):
+    monkeypatch.setenv("DATABASE_PATH", str(tmp_path / "test.db"))
+    predictor = MatchPredictor()
+    db = predictor.db.sync
+    db.save_team_stats("Arsenal", team_stats("Arsenal", 30))
+    db.save_team_stats("Chelsea", team_stats("Chelsea", 10))
+    old_key = predictor._cache_key("Arsenal", "Chelsea")
+    simple_predict = predictor._simple_predict
+
+    async def write_while_predicting(home_team, away_team):
+        prediction = await simple_predict(home_team, away_team)
+        # Lands after the stats were read, before the result is cached
+        db.save_team_stats("Arsenal", team_stats("Arsenal", 5))
+        return prediction
+
+    monkeypatch.setattr(predictor, "_simple_predict", write_while_predicting)
+    asyncio.run(predictor.predict("Arsenal", "Chelsea"))
+
+    new_key = predictor._cache_key("Arsenal", "Chelsea")
+    assert new_key != old_key
+    assert predictor.cache.get(new_key) is None
+    assert predictor.cache.get(old_key) is not None
@@ -0,0 +1,102 @@
+"""
+/api/stats/{team} against the local football-data.org stand-in
+
+Stats are served from the database the refresh scheduler keeps current,
+with the canonical team name. refresh=true asks the scheduler for a
+standings refresh, which requests share instead of each going upstream.
+Until the first refresh finishes, stats that are not stored yet answer 503
+rather than calling upstream from the request.
+"""
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from benchmarks.fake_football_data import FakeFootballData
+from data.rate_limiter import upstream_limiter
+from data.response_cache import ResponseCache, StaleResponses
+
+STATS_KEYS = {
+    "team", "matches_played", "wins", "draws", "losses", "goals_for",
+    "goals_against", "goal_diff", "points", "position", "form"
+}
+STANDINGS_PATH = "/v4/competitions/PL/standings"
+
+
+@pytest.fixture(scope="module")
+def api(tmp_path_factory):
+    """App on a throwaway database and response cache, talking to the fake upstream"""
+    tmp = tmp_path_factory.mktemp("api")
+    upstream = FakeFootballData().start()
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv("DATABASE_PATH", str(tmp / "test.db"))
+        import main
+        # Settings read at import time, possibly before this fixture ran
+        mp.setattr(main, "MODEL_WATCH_INTERVAL", 0)
+        for fetcher in (main.data_fetcher, main.refresh_scheduler.data_fetcher):
+            mp.setattr(fetcher, "base_url", upstream.base_url)
+            mp.setattr(fetcher, "photo_url", upstream.photo_url)
+            mp.setattr(fetcher, "response_cache", ResponseCache(str(tmp / "http_cache")))
+        mp.setattr(upstream_limiter, "rate", 1e6 / 60)
+        mp.setattr(upstream_limiter, "capacity", 1000)
+        mp.setattr(upstream_limiter, "tokens", 1000.0)
+        with TestClient(main.app) as client:
+            # Wait for the first background refresh to finish
+            deadline = time.monotonic() + 30
+            while not main.refresh_scheduler.ready and time.monotonic() < deadline:
+                time.sleep(0.05)
+            yield client, upstream, main
+    upstream.stop()
+
+
+def test_stored_stats_shape(api):
+    client, _, _ = api
+    response = client.get("/api/stats/Arsenal")
+    assert response.status_code == 200
+    stats = response.json()
+    assert set(stats) >= STATS_KEYS
+    assert stats["team"] == "Arsenal FC"
+
+
+def test_refresh_requests_share_one_upstream_call(api, monkeypatch):
+    client, upstream, main = api
+    # The last standings refresh is long past, so the first request refreshes
+    monkeypatch.setitem(main.refresh_scheduler.refreshed_at, "standings", float("-inf"))
+    before = upstream.calls.get(STANDINGS_PATH, 0)
+    for _ in range(3):
+        response = client.get("/api/stats/Arsenal", params={"refresh": "true"})
+        assert response.status_code == 200
+        stats = response.json()
+        assert set(stats) >= STATS_KEYS
+        assert stats["team"] == "Arsenal FC"
+    assert upstream.calls.get(STANDINGS_PATH, 0) == before + 1
+
+
+def test_stats_while_refresh_pending(api, monkeypatch):
+    client, upstream, main = api
+    monkeypatch.setattr(main.refresh_scheduler, "ready", False)
+    before = upstream.calls
+    # Stored stats are served while the first refresh is still running
+    assert client.get("/api/stats/Arsenal").status_code == 200
+    response = client.get("/api/stats/Luton")
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert upstream.calls == before
+
+
+def test_unknown_team_is_not_found(api):
+    client, upstream, _ = api
+    before = upstream.calls
+    assert client.get("/api/stats/Luton").status_code == 404
+    assert upstream.calls == before
+
+
+def test_stale_standings_are_flagged(api, monkeypatch):
+    client, _, main = api
+    assert "X-Data-Stale" not in client.get("/api/stats/Arsenal").headers
+    stale = StaleResponses()
+    stale.mark("competitions/PL/standings", 1700000000.0)
+    monkeypatch.setattr(main, "stale_responses", stale)
+    response = client.get("/api/stats/Arsenal")
+    assert response.headers["X-Data-Stale"] == "true"
+    assert response.headers["X-Data-Fetched-At"].startswith("2023-11-14T22:13:20")